@@ -0,0 +1,62 @@
+"""
+Measure the per-action overhead of the action pipeline.
+
+Usage (from the 'src' directory):
+    python -m benchmarks.action_dispatch
+"""
+from __future__ import annotations
+
+import tracemalloc
+
+from benchmarks.common import new_engine, report, time_per_call
+from commands.actions import BumpAction, MovementAction
+
+NUMBER = 20_000
+
+
+def main() -> None:
+    engine = new_engine()
+    player = engine.player
+
+    # Bump back and forth into the same spot, so the player never wanders off.
+    steps = [(1, 0), (-1, 0)]
+    state = {"i": 0}
+
+    def next_step():
+        state["i"] ^= 1
+        return steps[state["i"]]
+
+    def fresh_bump() -> None:
+        BumpAction(player, *next_step()).perform()
+
+    reused = BumpAction(player, 0, 0)
+
+    def reused_bump() -> None:
+        reused.retarget(*next_step()).perform()
+
+    def fresh_movement() -> None:
+        MovementAction(player, *next_step()).perform()
+
+    report("BumpAction, new object per step", time_per_call(fresh_bump, NUMBER))
+    report("BumpAction, reused and re-aimed", time_per_call(reused_bump, NUMBER))
+    report("MovementAction, new object per step", time_per_call(fresh_movement, NUMBER))
+
+    enemy_turn = time_per_call(engine.handle_enemy_turns, 200)
+
+    # Count the memory blocks left behind by a batch of enemy turns.
+    tracemalloc.start()
+    engine.handle_enemy_turns()
+    before = tracemalloc.take_snapshot()
+    for _ in range(100):
+        engine.handle_enemy_turns()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    report("Engine.handle_enemy_turns (one full turn)", enemy_turn)
+
+    leaked = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    print(f"{'Blocks retained after 100 enemy turns':<48} {leaked:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Shared helpers for the benchmark scripts.
+
+The benchmarks are run from the 'src' directory, e.g. 'python -m benchmarks.action_dispatch'.
+"""
+from __future__ import annotations
+
+import copy
+import random
+import timeit
+from typing import Callable
+
+from engine.dungeon_gen import generate_dungeon
+from engine.engine import Engine
+from entities import entity_factories
+
+
+def new_engine(map_width: int = 80, map_height: int = 45, seed: int = 0) -> Engine:
+    """
+    Create an engine with a freshly generated dungeon, using the same settings as the game.
+    """
+    player = copy.deepcopy(entity_factories.player)
+    engine = Engine(player=player, rng=random.Random(seed))
+    engine.game_map = generate_dungeon(
+        max_rooms=30,
+        room_min_size=6,
+        room_max_size=10,
+        map_width=map_width,
+        map_height=map_height,
+        max_monsters_per_room=2,
+        engine=engine,
+    )
+    engine.update_fov()
+    return engine
+
+
+def time_per_call(func: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """
+    Return the best time per call of 'func' in seconds.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def report(label: str, seconds: float) -> None:
+    """
+    Print a single benchmark result line.
+    """
+    print(f"{label:<48} {seconds * 1e6:>10.2f} us")
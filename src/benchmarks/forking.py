@@ -0,0 +1,35 @@
+"""
+Measure the cost of forking a game, against deep-copying it, and of a short lookahead rollout on a fork.
+
+Usage (from the 'src' directory):
+    python -m benchmarks.forking
+"""
+from __future__ import annotations
+
+import copy
+
+from benchmarks.common import new_engine, report, time_per_call
+from commands.actions import BumpAction
+
+ROLLOUT_TURNS = 10
+
+
+def main() -> None:
+    engine = new_engine()
+
+    def rollout() -> None:
+        child = engine.fork()
+        step = BumpAction(child.player, 0, 0)
+        for _ in range(ROLLOUT_TURNS):
+            child.event_handler.handle_action(step.retarget(*child.rng.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])))
+
+    report("copy.deepcopy(engine)", time_per_call(lambda: copy.deepcopy(engine), 50))
+    report("Engine.fork", time_per_call(engine.fork, 2_000))
+    report(f"Engine.fork + {ROLLOUT_TURNS} turn rollout", time_per_call(rollout, 200))
+
+    big = new_engine(1000, 1000)
+    report("Engine.fork, 1000x1000 map", time_per_call(big.fork, 200))
+
+
+if __name__ == "__main__":
+    main()
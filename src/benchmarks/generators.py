@@ -0,0 +1,60 @@
+"""
+Compare the dungeon generators on time and peak memory at several map sizes.
+
+Usage (from the 'src' directory):
+    python -m benchmarks.generators [--sizes 80x45 500x500 2000x2000]
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+import time
+import tracemalloc
+from typing import Tuple
+
+from engine.engine import Engine
+from engine.generators import GENERATORS, DungeonGenerator
+from entities import entity_factories
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def run(generator: DungeonGenerator, seed: int) -> float:
+    """
+    Generate one map and return the time it took in seconds.
+    """
+    engine = Engine(player=copy.deepcopy(entity_factories.player), rng=random.Random(seed))
+
+    started = time.perf_counter()
+    engine.game_map = generator.generate(engine)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=[(80, 45), (500, 500), (2000, 2000)])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'generator':<10} {'size':>10} {'best time':>12} {'peak memory':>14}")
+    for width, height in args.sizes:
+        for name, generator_cls in GENERATORS.items():
+            generator = generator_cls(map_width=width, map_height=height)
+
+            best = min(run(generator, seed) for seed in range(args.repeat))
+
+            # Measure memory in a separate run, tracemalloc slows everything down.
+            tracemalloc.start()
+            run(generator, seed=0)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(f"{name:<10} {f'{width}x{height}':>10} {best * 1000:>9.2f} ms {peak / 2 ** 20:>11.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Measure the cost of rendering the map with many lights on screen.
+
+Usage (from the 'src' directory):
+    python -m benchmarks.lighting
+"""
+from __future__ import annotations
+
+import numpy as np  # type: ignore
+import tcod
+
+from benchmarks.common import new_engine, report, time_per_call
+from engine.lighting import Light
+
+LIGHT_COUNTS = (0, 100, 300)  # No lights at all is the plain two-tone rendering, for reference.
+
+
+def main() -> None:
+    for count in LIGHT_COUNTS:
+        engine = new_engine()
+        game_map = engine.game_map
+        console = tcod.console.Console(game_map.width, game_map.height, order="F")
+
+        # Torches on random floor tiles, in a handful of colors.
+        floors = np.argwhere(game_map.tiles["walkable"])
+        picks = engine.rng.sample(range(len(floors)), min(count, len(floors)))
+        colors = [(255, 160, 60), (120, 180, 255), (140, 255, 140)]
+        for i, pick in enumerate(picks):
+            x, y = floors[pick]
+            game_map.lighting.add_light(int(x), int(y), Light(radius=6, color=colors[i % len(colors)]))
+
+        def cold() -> None:
+            game_map.lighting.invalidate()
+            game_map.render(console)
+
+        report(f"GameMap.render, {count} static lights, cold cache", time_per_call(cold, 20))
+        report(f"GameMap.render, {count} static lights, cached", time_per_call(lambda: game_map.render(console), 200))
+
+
+if __name__ == "__main__":
+    main()
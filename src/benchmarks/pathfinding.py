@@ -0,0 +1,82 @@
+"""
+Measure how long monsters take to find their way to the player across a large map, and to a nearby tile.
+
+Usage (from the 'src' directory):
+    python -m benchmarks.pathfinding [--size 2000x2000] [--generator bsp]
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+
+import numpy as np  # type: ignore
+
+from benchmarks.common import report, time_per_call
+from benchmarks.generators import parse_size
+from engine.engine import Engine
+from engine.generators import GENERATORS
+from entities import entity_factories
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=parse_size, default=(2000, 2000))
+    parser.add_argument("--generator", choices=sorted(GENERATORS), default="bsp")
+    parser.add_argument("--monsters", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = Engine(player=copy.deepcopy(entity_factories.player), rng=random.Random(0))
+    width, height = args.size
+    engine.game_map = GENERATORS[args.generator](map_width=width, map_height=height).generate(engine)
+    game_map = engine.game_map
+    player = engine.player
+
+    # The monsters furthest from the player.
+    monsters = sorted(
+        (actor for actor in game_map.actors if actor is not player),
+        key=lambda actor: max(abs(actor.x - player.x), abs(actor.y - player.y)),
+    )[-args.monsters:]
+    if not monsters:
+        print("No monsters were generated.")
+        return
+
+    def path_all() -> None:
+        for monster in monsters:
+            monster.ai.get_path_to(player.x, player.y)
+
+    print(f"{len(monsters)} monsters, {width}x{height} {args.generator} map")
+    report("get_path_to per monster", time_per_call(path_all, number=1, repeat=3) / len(monsters))
+
+    room_graph, game_map.room_graph = game_map.room_graph, None
+    report("get_path_to per monster, no room graph", time_per_call(path_all, number=1, repeat=1) / len(monsters))
+    game_map.room_graph = room_graph
+
+    # Short chases: a reachable tile 6 to 10 tiles away from each monster.
+    labels = game_map.connectivity.labels
+    chases = []
+    for monster in monsters:
+        x1, y1 = max(0, monster.x - 10), max(0, monster.y - 10)
+        nearby = np.argwhere(labels[x1: monster.x + 11, y1: monster.y + 11] == labels[monster.x, monster.y])
+        nearby = [(int(x) + x1, int(y) + y1) for x, y in nearby]
+        nearby = [(x, y) for x, y in nearby if max(abs(x - monster.x), abs(y - monster.y)) >= 6]
+        if nearby:
+            chases.append((monster, engine.rng.choice(nearby)))
+
+    whole_map = (0, 0, game_map.width, game_map.height)
+
+    def chase_local() -> None:
+        for monster, (x, y) in chases:
+            monster.ai.get_path_to(x, y)
+
+    def chase_whole_map() -> None:
+        for monster, (x, y) in chases:
+            monster.ai.get_path_in_window(whole_map, x, y)
+
+    if chases:
+        report("short chase, get_path_to", time_per_call(chase_local, number=1, repeat=3) / len(chases))
+        report("short chase, whole map search", time_per_call(chase_whole_map, number=1, repeat=3) / len(chases))
+
+
+if __name__ == "__main__":
+    main()
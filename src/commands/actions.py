@@ -4,10 +4,10 @@ Copyright: 2023.
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Tuple
+from typing import Optional, TYPE_CHECKING, Tuple
 
 if TYPE_CHECKING:
-    from entities.entity import Entity
+    from entities.entity import Actor, Entity
     from engine.engine import Engine
 
 
@@ -39,6 +39,16 @@ class Action:
         """
         raise NotImplementedError()
 
+    def repeat(self) -> bool:
+        """
+        Return True if this action should be performed again on the next turn.
+
+        Checked after every turn the action was performed in. Actions which take many turns, like travel, override this.
+
+        :return: bool
+        """
+        return False
+
 
 class EscapeAction(Action):
     """
@@ -65,6 +75,15 @@ class ActionWithDirection(Action):
         self.dx = dx
         self.dy = dy
 
+    def retarget(self, dx: int, dy: int) -> ActionWithDirection:
+        """
+        Point this action in a new direction so that it can be reused instead of allocating a new action every turn.
+        :return: This action.
+        """
+        self.dx = dx
+        self.dy = dy
+        return self
+
     @property
     def dest_xy(self) -> Tuple[int, int]:
         """
@@ -74,46 +93,87 @@ class ActionWithDirection(Action):
         return self.entity.x + self.dx, self.entity.y + self.dy
 
     @property
-    def blocking_entity(self) -> Entity:
+    def blocking_entity(self) -> Optional[Entity]:
         """Return the blocking entity at this actions' destination."""
         return self.engine.game_map.get_blocking_entity_at_location(*self.dest_xy)
 
     def perform(self) -> None:
-        raise NotImplementedError()
-
+        """
+        Resolve the destination and the entity blocking it once, then hand both to 'resolve'.
+        """
+        dest_x, dest_y = self.dest_xy
+        return self.resolve(dest_x, dest_y, self.engine.game_map.get_blocking_entity_at_location(dest_x, dest_y))
 
-class MeleeAction(ActionWithDirection):
-    def perform(self) -> None:
-        target = self.blocking_entity
-        if not target:
-            return  # No entity to attack
+    def resolve(self, dest_x: int, dest_y: int, blocker: Optional[Entity]) -> None:
+        """
+        Perform this action against an already looked up destination.
 
-        print(f"You kick the {target.name} in the balls!")
+        This method must be overriden by ActionWithDirection subclasses.
 
+        :param dest_x: The destination x coordinate.
+        :param dest_y: The destination y coordinate.
+        :param blocker: The blocking entity at the destination, if any.
+        :return: None
+        """
+        raise NotImplementedError()
 
-class MovementAction(ActionWithDirection):
-    """
-    An action to move an entity.
-    """
+    def _attack(self, blocker: Optional[Entity]) -> None:
+        """
+        Attack the actor blocking the destination, if there is one, dealing the attacker's power less the target's
+        defense in damage.
+        :param blocker: The blocking entity at the destination, if any.
+        """
+        if blocker not in self.engine.game_map.living_actors:
+            return  # No actor to attack
 
-    def perform(self) -> None:
+        attacker: Actor = self.entity  # type: ignore
+        target: Actor = blocker  # type: ignore
+        damage = attacker.fighter.power - target.fighter.defense
 
-        dest_x, dest_y = self.dest_xy
+        attack_desc = f"{attacker.name.capitalize()} kicks the {target.name}"
+        if damage > 0:
+            self.engine.message_log.add_message(f"{attack_desc} for {damage} hit points.")
+            target.fighter.hp -= damage
+        else:
+            self.engine.message_log.add_message(f"{attack_desc} but does no damage.")
 
+    def _move(self, dest_x: int, dest_y: int, blocker: Optional[Entity]) -> None:
+        """
+        Move the entity to the destination, unless it is out of bounds or blocked.
+        :param dest_x: The destination x coordinate.
+        :param dest_y: The destination y coordinate.
+        :param blocker: The blocking entity at the destination, if any.
+        """
         if not self.engine.game_map.in_bounds(dest_x, dest_y):
             return  # Destination out of bounds.
         if not self.engine.game_map.tiles["walkable"][dest_x, dest_y]:
             return  # Destination is blocked by a tile.
-        if self.engine.game_map.get_blocking_entity_at_location(dest_x, dest_y):
+        if blocker:
             return  # Destination is blocked by an entity.
 
         # Otherwise move
         self.entity.move(self.dx, self.dy)
 
 
+class MeleeAction(ActionWithDirection):
+    def resolve(self, dest_x: int, dest_y: int, blocker: Optional[Entity]) -> None:
+        self._attack(blocker)
+
+
+class MovementAction(ActionWithDirection):
+    """
+    An action to move an entity.
+    """
+
+    def resolve(self, dest_x: int, dest_y: int, blocker: Optional[Entity]) -> None:
+        self._move(dest_x, dest_y, blocker)
+
+
 class BumpAction(ActionWithDirection):
-    def perform(self) -> None:
-        if self.blocking_entity:
-            return MeleeAction(self.entity, self.dx, self.dy).perform()
+    def resolve(self, dest_x: int, dest_y: int, blocker: Optional[Entity]) -> None:
+        # Dispatch straight to the shared handlers, so no second action is built and the destination isn't looked up
+        #   twice.
+        if blocker:
+            return self._attack(blocker)
         else:
-            return MovementAction(self.entity, self.dx, self.dy).perform()
+            return self._move(dest_x, dest_y, blocker)
@@ -0,0 +1,192 @@
+"""
+Travel commands, which walk the player for many turns from a single keypress.
+"""
+from __future__ import annotations
+
+from typing import Optional, TYPE_CHECKING, Tuple
+
+import numpy as np  # type: ignore
+import tcod
+
+from commands.actions import Action, MovementAction
+
+if TYPE_CHECKING:
+    from entities.entity import Actor, Entity
+
+# The longest walk a single command makes, in case it never arrives.
+MAX_TRAVEL_TURNS = 1000
+
+# The eight directions a step can take.
+_DIRECTIONS = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+class TravelAction(Action):
+    """
+    Walk to a destination, one step per turn, stopping as soon as a hostile comes into view.
+
+    The route is planned once, as a distance map over the explored tiles, and every turn steps downhill on it. The
+    EventHandler performs the action again for as long as 'repeat' says so, without going back to the event loop, so no
+    frames are drawn until the walk is over.
+    """
+
+    def __init__(self, entity: Entity, dest_x: int, dest_y: int):
+        super().__init__(entity)
+        self.dest_x, self.dest_y = dest_x, dest_y
+        self.distance: Optional[np.ndarray] = None  # Set by 'plan'.
+        self.turns = 0
+        self.moved = False
+
+        # Reused for every step, re-aimed each turn.
+        self.step_action = MovementAction(entity, 0, 0)
+
+    def goals(self) -> Optional[np.ndarray]:
+        """
+        Return a boolean mask of the tiles to walk to, or None if there are none.
+        """
+        game_map = self.engine.game_map
+        if not game_map.in_bounds(self.dest_x, self.dest_y):
+            return None
+
+        goals = np.zeros((game_map.width, game_map.height), dtype=bool, order="F")
+        goals[self.dest_x, self.dest_y] = True
+        return goals
+
+    def plan(self) -> bool:
+        """
+        Compute the distance map to the goals, walking only over explored tiles.
+
+        Returns False, logging why, if there is nothing to do: a hostile is already in view, or no goal can be reached.
+        """
+        hostile = self.visible_hostile()
+        if hostile:
+            self.engine.message_log.add_message(f"Not with the {hostile.name} in view.")
+            return False
+
+        game_map = self.engine.game_map
+        goals = self.goals()
+        if goals is None:
+            return self.give_up()
+
+        explored = game_map.explored.to_array()
+        cost = np.where(explored, game_map.walk_cost, 0)
+
+        distance = tcod.path.maxarray((game_map.width, game_map.height), dtype=np.int32, order="F")
+        distance[goals & explored] = 0
+        tcod.path.dijkstra2d(distance, cost, 2, 3, out=distance)
+
+        here = distance[self.entity.x, self.entity.y]
+        if here == np.iinfo(distance.dtype).max:
+            return self.give_up()
+        if here == 0:
+            return False  # Already there.
+
+        self.distance = distance
+        return True
+
+    def give_up(self) -> bool:
+        """
+        Log that no goal can be reached and return False.
+        """
+        self.engine.message_log.add_message("You don't know the way there.")
+        return False
+
+    def perform(self) -> None:
+        self.moved = False
+        if self.distance is None and not self.plan():
+            return
+
+        step = self.next_step()
+        if step is None:
+            return
+
+        x, y = self.entity.x, self.entity.y
+        self.step_action.retarget(*step).perform()
+        self.moved = (self.entity.x, self.entity.y) != (x, y)
+        self.turns += 1
+
+    def next_step(self) -> Optional[Tuple[int, int]]:
+        """
+        Return the direction of the free neighbouring tile closest to the goals, or None if no step gets closer.
+        """
+        game_map = self.engine.game_map
+        distance = self.distance
+        x, y = self.entity.x, self.entity.y
+
+        best: Optional[Tuple[int, int]] = None
+        best_distance = distance[x, y]
+        for dx, dy in _DIRECTIONS:
+            dest_x, dest_y = x + dx, y + dy
+            if not game_map.in_bounds(dest_x, dest_y) or distance[dest_x, dest_y] >= best_distance:
+                continue
+            if game_map.get_blocking_entity_at_location(dest_x, dest_y):
+                continue
+            best, best_distance = (dx, dy), distance[dest_x, dest_y]
+
+        return best
+
+    def repeat(self) -> bool:
+        return self.keep_going() and bool(self.distance[self.entity.x, self.entity.y])
+
+    def keep_going(self) -> bool:
+        """
+        Return False if the walk has to stop: the last step failed, the turn limit was reached or a hostile came into
+        view.
+        """
+        if not self.moved or self.turns >= MAX_TRAVEL_TURNS:
+            return False
+
+        hostile = self.visible_hostile()
+        if hostile:
+            self.engine.message_log.add_message(f"You stop, the {hostile.name} comes into view.")
+            return False
+
+        return True
+
+    def visible_hostile(self) -> Optional[Actor]:
+        """
+        Return a living actor other than the player in the player's view, if there is one.
+        """
+        game_map = self.engine.game_map
+        for actor in game_map.actors:
+            if actor is not self.engine.player and game_map.visible[actor.x, actor.y]:
+                return actor
+        return None
+
+
+class AutoExploreAction(TravelAction):
+    """
+    Walk to the nearest unexplored part of the map, over and over, until the whole reachable map is explored or a
+    hostile comes into view.
+
+    Each leg walks to the closest frontier tile, an explored floor next to unexplored tiles, and the distance map is
+    only recomputed once one is reached.
+    """
+
+    def __init__(self, entity: Entity):
+        super().__init__(entity, entity.x, entity.y)
+
+    def goals(self) -> Optional[np.ndarray]:
+        game_map = self.engine.game_map
+        explored = game_map.explored.to_array()
+
+        # Mark every tile with an unexplored neighbour, by OR-ing the unexplored mask shifted in all eight directions.
+        unexplored = np.pad(~explored, 1, constant_values=False)
+        near_unexplored = np.zeros_like(explored)
+        for dx, dy in _DIRECTIONS:
+            near_unexplored |= unexplored[1 + dx: 1 + dx + game_map.width, 1 + dy: 1 + dy + game_map.height]
+
+        goals = near_unexplored & explored & game_map.tiles["walkable"]
+        return goals if goals.any() else None
+
+    def give_up(self) -> bool:
+        self.engine.message_log.add_message("There is nothing left to explore.")
+        return False
+
+    def repeat(self) -> bool:
+        if not self.keep_going():
+            return False
+
+        if self.distance[self.entity.x, self.entity.y] == 0:
+            # A frontier was reached, plan the next leg from what has been seen since.
+            return self.plan()
+        return True
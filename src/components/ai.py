@@ -1,16 +1,20 @@
 from __future__ import annotations
 
-from typing import List, Tuple, TYPE_CHECKING
+from typing import List, Optional, Tuple, TYPE_CHECKING
 
-import numpy as np
+import numpy as np  # type: ignore
 import tcod
 
-from commands.actions import Action, MeleeAction, MovementAction, WaitAction
+from commands.actions import Action, MeleeAction, MovementAction
 from components.base_component import BaseComponent
 
 if TYPE_CHECKING:
+    from engine.change_journal import Rect
     from entities.entity import Actor
 
+# How far around the start and destination a local path search looks before falling back to the whole map.
+LOCAL_SEARCH_PADDING = 8
+
 
 class BaseAI(Action, BaseComponent):
     """
@@ -24,42 +28,95 @@ class BaseAI(Action, BaseComponent):
     def get_path_to(self, dest_x: int, dest_y: int) -> List[Tuple[int, int]]:
         """
         Compute and return a path to the target position.
-        
+
+        On maps built out of rooms, long routes are planned room to room and only the path to the next room is
+        returned, so the caller should ask again once it has been walked.
+
         If there is no valid path then return an empty list.
         :param dest_x: 
         :param dest_y: 
         :return: 
         """""
+        game_map = self.entity.game_map
+        start = (self.entity.x, self.entity.y)
+
+        # Reject targets in another connected component before paying for a search that can't succeed.
+        if not game_map.connectivity.connected(start, (dest_x, dest_y)):
+            return []
+
+        if game_map.room_graph:
+            leg = game_map.room_graph.next_leg(start, (dest_x, dest_y))
+            if leg:
+                window, (waypoint_x, waypoint_y) = leg
+                path = self.get_path_in_window(window, waypoint_x, waypoint_y)
+                if path:
+                    return path
+
+        # Most chases are short, so first search a padded window around both ends. The whole map is only searched when
+        #   the window holds no route.
+        whole_map = (0, 0, game_map.width, game_map.height)
+        window = (
+            max(0, min(start[0], dest_x) - LOCAL_SEARCH_PADDING),
+            max(0, min(start[1], dest_y) - LOCAL_SEARCH_PADDING),
+            min(game_map.width, max(start[0], dest_x) + LOCAL_SEARCH_PADDING + 1),
+            min(game_map.height, max(start[1], dest_y) + LOCAL_SEARCH_PADDING + 1),
+        )
+        path = self.get_path_in_window(window, dest_x, dest_y)
+        if path or window == whole_map:
+            return path
+
+        return self.get_path_in_window(whole_map, dest_x, dest_y)
+
+    def get_path_in_window(self, window: Rect, dest_x: int, dest_y: int) -> List[Tuple[int, int]]:
+        """
+        Compute and return a path to the target position which stays within a rectangle of the map.
 
-        # Copy the walkable array.
-        cost = np.array(self.entity.game_map.tiles["walkable"], dtype=np.int8)
+        If there is no valid path then return an empty list.
+        :param window: The (x1, y1, x2, y2) rectangle to search, x2 and y2 exclusive. It must contain both ends.
+        :param dest_x:
+        :param dest_y:
+        :return:
+        """
+        game_map = self.entity.game_map
+        x1, y1, x2, y2 = window
 
-        for entity in self.entity.game_map.entities:
-            # Check that an entity blocks movement and the cost isn't zero (blocking).
-            if entity.blocks_movement and cost[entity.x, entity.y]:
-                # Add to the cost of the blocked position.
-                # A lower number means more enemies will crowd behind each other in hallways. A higher number means
-                # enemies will try to take longer routes to surround the player.
-                cost[entity.x, entity.y] += 10
+        # Add to the cost of the walkable tiles blocked by entities, in one step over the window's occupancy grid, so
+        #   the setup costs in proportion to the window however many entities the map holds.
+        # A lower number means more enemies will crowd behind each other in hallways. A higher number means enemies will
+        #   try to take longer routes to surround the player.
+        cost = game_map.walk_cost[x1:x2, y1:y2]
+        cost = np.where((game_map.occupancy[x1:x2, y1:y2] != 0) & (cost != 0), cost + 10, cost)
 
         # Creat a graph from the cost array and pass that graph to a new pathfinder.
         graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
         pathfinder = tcod.path.Pathfinder(graph)
 
-        pathfinder.add_root((self.entity.x, self.entity.y))  # Start position.
+        pathfinder.add_root((self.entity.x - x1, self.entity.y - y1))  # Start position.
 
         # Compute the path to the destination and remove the starting point.
         # noinspection PyTypeChecker
-        path: List[List[int]] = pathfinder.path_to((dest_x, dest_y))[1:].tolist()
+        path: List[List[int]] = pathfinder.path_to((dest_x - x1, dest_y - y1))[1:].tolist()
 
-        # Convert from List[List[int]] to List[Tuple[int, int]]
-        return [(index[0], index[1]) for index in path]
+        # Convert from List[List[int]] to List[Tuple[int, int]], back in map coordinates.
+        return [(index[0] + x1, index[1] + y1) for index in path]
 
 
 class HostileEnemy(BaseAI):
     def __init__(self, entity: Actor):
         super().__init__(entity=entity)
         self.path: List[Tuple[int, int]] = []
+        self.goal: Optional[Tuple[int, int]] = None  # Where the target was last seen.
+
+        # Reusable actions, re-aimed every turn so that the enemy turn loop doesn't allocate new action objects.
+        self.melee_action = MeleeAction(entity, 0, 0)
+        self.movement_action = MovementAction(entity, 0, 0)
+
+    def fork(self, entity: Actor) -> HostileEnemy:
+        clone = super().fork(entity)
+        clone.path = list(self.path)
+        clone.melee_action = MeleeAction(entity, 0, 0)
+        clone.movement_action = MovementAction(entity, 0, 0)
+        return clone
 
     def perform(self) -> None:
         target = self.engine.player
@@ -69,12 +126,19 @@ class HostileEnemy(BaseAI):
 
         if self.engine.game_map.visible[self.entity.x, self.entity.y]:
             if distance <= 1:
-                return MeleeAction(self.entity, dx, dy).perform()
+                return self.melee_action.retarget(dx, dy).perform()
 
-            self.path = self.get_path_to(target.x, target.y)
+            self.goal = (target.x, target.y)
+            self.path = self.get_path_to(*self.goal)
+        elif not self.path and self.goal:
+            # Long routes come one leg at a time, keep heading for where the target was last seen.
+            self.path = self.get_path_to(*self.goal)
+            if not self.path:
+                self.goal = None
 
         if self.path:
             dest_x, dest_y = self.path.pop(0)
-            return MovementAction(self.entity, dest_x - self.entity.x, dest_y - self.entity.y).perform()
+            return self.movement_action.retarget(dest_x - self.entity.x, dest_y - self.entity.y).perform()
 
-        return WaitAction(self.entity).perform()
+        # Otherwise wait, which does nothing, so there is no need to build a WaitAction for it.
+        return None
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TypeVar, TYPE_CHECKING
+
+from engine.copy_on_write import shallow_copy
 
 if TYPE_CHECKING:
     from entities.entity import Entity
     from engine import Engine
 
+T = TypeVar("T", bound="BaseComponent")
+
 
 class BaseComponent:
     """
@@ -20,3 +24,13 @@ class BaseComponent:
         :return:
         """
         return self.entity.game_map.engine
+
+    def fork(self: T, entity: Entity) -> T:
+        """
+        Return a shallow copy of this component for a copy of its entity.
+        :param entity: The copy of the owning entity.
+        :return:
+        """
+        clone = shallow_copy(self)
+        clone.entity = entity
+        return clone
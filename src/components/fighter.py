@@ -1,7 +1,16 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from components.base_component import BaseComponent
 
+if TYPE_CHECKING:
+    from entities.entity import Actor
+
 
 class Fighter(BaseComponent):
+    entity: Actor
+
     def __init__(self, hp: int, defense: int, power: int):
         self.max_hp = hp
         self._hp = hp
@@ -15,3 +24,24 @@ class Fighter(BaseComponent):
     @hp.setter
     def hp(self, value: int) -> None:
         self._hp = max(0, min(value, self.max_hp))
+        if self._hp == 0 and self.entity.ai:
+            self.die()
+
+    def die(self) -> None:
+        """
+        Turn the entity into a corpse, which no longer acts or blocks movement.
+        :return: None
+        """
+        if self.entity is self.engine.player:
+            death_message = "You died!"
+        else:
+            death_message = f"{self.entity.name} is dead!"
+
+        self.entity.char = "%"
+        self.entity.color = (191, 0, 0)
+        self.entity.blocks_movement = False
+        self.entity.ai = None
+        self.entity.name = f"remains of {self.entity.name}"
+        self.entity.game_map.reclassify(self.entity)
+
+        self.engine.message_log.add_message(death_message)
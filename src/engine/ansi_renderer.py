@@ -0,0 +1,108 @@
+"""
+This module contains the AnsiRenderer class, which draws consoles to a terminal with ANSI escape sequences.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, TextIO
+
+import numpy as np  # type: ignore
+from tcod.console import Console
+
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+RESET = "\x1b[0m"
+CLEAR_SCREEN = "\x1b[2J"
+
+
+def _rows(console: Console) -> np.ndarray:
+    """
+    Return the cells of a console as a (height, width) array, row by row like a terminal, whatever the console's order.
+    """
+    # An "F" order console indexes its arrays [x, y]. tcod only keeps the order a console was created with privately.
+    rgb = console.rgb
+    return rgb.T if console._order == "F" else rgb
+
+
+class AnsiRenderer:
+    """
+    Draws consoles as 24-bit color text to a stream, a terminal or a file to replay later, without needing a display.
+
+    It can stand in for a tcod Context in 'Engine.render', as all it needs is 'present'.
+
+    Only the cells which changed since the previous frame are written, so the output per frame is proportional to what
+    moved on screen. Changed cells which follow each other along a row share a single cursor move, and a color sequence
+    is only written when a cell's colors differ from the last ones written.
+    """
+
+    def __init__(self, stream: TextIO):
+        """
+        Initializes a new AnsiRenderer.
+        :param stream: Where to write the frames.
+        """
+        self.stream = stream
+        self.frames = 0
+        self.bytes_written = 0
+
+        self._previous: Optional[np.ndarray] = None  # The cells of the last frame written.
+        self._fg: Optional[List[int]] = None  # The colors the terminal is currently set to.
+        self._bg: Optional[List[int]] = None
+
+    def present(self, console: Console) -> None:
+        """
+        Write the cells of the console which changed since the last frame.
+        """
+        rows = _rows(console)
+        out: List[str] = []
+
+        if self._previous is None or self._previous.shape != rows.shape:
+            # First frame, or the console was resized: redraw everything.
+            out.append(HIDE_CURSOR + RESET + CLEAR_SCREEN)
+            self._fg = self._bg = None
+            changed = np.ones(rows.shape, dtype=bool)
+        else:
+            previous = self._previous
+            changed = (
+                (rows["ch"] != previous["ch"])
+                | (rows["fg"] != previous["fg"]).any(axis=-1)
+                | (rows["bg"] != previous["bg"]).any(axis=-1)
+            )
+
+        ys, xs = np.nonzero(changed)
+        if len(ys):
+            cells = rows[ys, xs]
+            cursor = None  # Where the terminal's cursor is, if known.
+            for y, x, ch, fg, bg in zip(
+                    ys.tolist(), xs.tolist(), cells["ch"].tolist(), cells["fg"].tolist(), cells["bg"].tolist()
+            ):
+                if cursor != (y, x):
+                    out.append(f"\x1b[{y + 1};{x + 1}H")
+
+                colors = []
+                if fg != self._fg:
+                    colors.append(f"38;2;{fg[0]};{fg[1]};{fg[2]}")
+                    self._fg = fg
+                if bg != self._bg:
+                    colors.append(f"48;2;{bg[0]};{bg[1]};{bg[2]}")
+                    self._bg = bg
+                if colors:
+                    out.append(f"\x1b[{';'.join(colors)}m")
+
+                out.append(chr(ch) if ch >= 32 else " ")
+                cursor = (y, x + 1)
+
+        self._previous = rows.copy()
+        self.frames += 1
+        if out:
+            self._write("".join(out))
+
+    def close(self) -> None:
+        """
+        Restore the terminal's colors and cursor, leaving it below the last frame.
+        """
+        height = 0 if self._previous is None else self._previous.shape[0]
+        self._write(f"{RESET}\x1b[{height + 1};1H{SHOW_CURSOR}")
+
+    def _write(self, text: str) -> None:
+        self.stream.write(text)
+        self.stream.flush()
+        self.bytes_written += len(text.encode("utf-8"))
@@ -0,0 +1,85 @@
+"""
+This module contains the ChangeJournal class, which records the regions of a GameMap whose tiles changed.
+"""
+from __future__ import annotations
+
+from typing import Callable, List, Tuple
+
+# A changed region as (x1, y1, x2, y2), with x2 and y2 exclusive like a slice.
+Rect = Tuple[int, int, int, int]
+
+
+class ChangeJournal:
+    """
+    A per-turn journal of dirty rectangles.
+
+    Tile writes record the rectangle they touched. At the end of each turn the journal is flushed, handing the list of
+    rectangles to every subscriber, so consumers like the FOV cache can update only what changed instead of redoing
+    the whole map.
+    """
+
+    def __init__(self) -> None:
+        self.rects: List[Rect] = []
+        self.subscribers: List[Callable[[List[Rect]], None]] = []
+
+    def __bool__(self) -> bool:
+        """Return True if there are changes which haven't been flushed yet."""
+        return bool(self.rects)
+
+    def record(self, x1: int, y1: int, x2: int, y2: int) -> None:
+        """
+        Record a changed rectangle.
+
+        A rectangle which continues the previous one along a row or column is merged into it, so that a tunnel dug one
+        tile at a time is recorded as a handful of strips rather than one rectangle per tile.
+
+        Args:
+            x1 (int): The left edge of the rectangle.
+            y1 (int): The top edge of the rectangle.
+            x2 (int): The right edge of the rectangle, exclusive.
+            y2 (int): The bottom edge of the rectangle, exclusive.
+        """
+        if x1 >= x2 or y1 >= y2:
+            return  # Nothing changed.
+
+        if self.rects:
+            last_x1, last_y1, last_x2, last_y2 = self.rects[-1]
+            if (last_x1, last_x2) == (x1, x2) and y1 <= last_y2 and last_y1 <= y2:
+                # Same columns, touching or overlapping rows.
+                self.rects[-1] = (x1, min(y1, last_y1), x2, max(y2, last_y2))
+                return
+            if (last_y1, last_y2) == (y1, y2) and x1 <= last_x2 and last_x1 <= x2:
+                # Same rows, touching or overlapping columns.
+                self.rects[-1] = (min(x1, last_x1), y1, max(x2, last_x2), y2)
+                return
+
+        self.rects.append((x1, y1, x2, y2))
+
+    def subscribe(self, callback: Callable[[List[Rect]], None]) -> None:
+        """
+        Register a callback which receives the list of changed rectangles whenever the journal is flushed.
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[List[Rect]], None]) -> None:
+        """
+        Remove a callback registered with 'subscribe'.
+        """
+        self.subscribers.remove(callback)
+
+    def flush(self) -> None:
+        """
+        Hand the recorded changes to every subscriber and start a new, empty journal.
+        """
+        if not self.rects:
+            return
+
+        rects, self.rects = self.rects, []
+        for callback in list(self.subscribers):  # Subscribers may unsubscribe as they go.
+            callback(rects)
+
+    def clear(self) -> None:
+        """
+        Drop the recorded changes without notifying subscribers.
+        """
+        self.rects = []
@@ -0,0 +1,174 @@
+"""
+Connected-component labelling of walkable space, used to reject unreachable targets without a path search.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+
+from engine.copy_on_write import own, shallow_copy, share
+
+if TYPE_CHECKING:
+    from engine.change_journal import Rect
+    from engine.game_map import GameMap
+
+# The neighbour offsets which, together with their opposites, make up 8-way movement.
+_HALF_NEIGHBOURHOOD = ((1, 0), (0, 1), (1, 1), (1, -1))
+
+
+def label_components(walkable: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Label the 8-way connected components of a boolean array.
+
+    Components are found with a vectorized union-find: every pair of adjacent walkable cells hooks the larger of their
+    roots onto the smaller one, then the parent array is compressed until every cell points at its root. Each round is
+    a handful of whole-array NumPy operations, and only a few rounds are needed.
+
+    Args:
+        walkable (np.ndarray): A 2D boolean array, True for cells which can be walked on.
+
+    Returns:
+        Tuple[np.ndarray, int]: An int32 array of labels with the same shape, 0 for cells which aren't walkable and 1 to
+            n for the n components, and the number of components n.
+    """
+    width, height = walkable.shape
+    flat_labels = np.zeros(width * height, dtype=np.int32)
+    labels = flat_labels.reshape((width, height), order="F")
+
+    cells = np.flatnonzero(walkable.ravel(order="F"))
+    if not len(cells):
+        return labels, 0
+
+    # Work on compact cell ids so that the parent array only holds walkable cells.
+    compact = np.full(width * height, -1, dtype=np.int32)
+    compact[cells] = np.arange(len(cells), dtype=np.int32)
+
+    heads: List[np.ndarray] = []
+    tails: List[np.ndarray] = []
+    for dx, dy in _HALF_NEIGHBOURHOOD:
+        y_from = max(0, -dy)
+        y_to = height - max(0, dy)
+        pairs = walkable[: width - dx, y_from:y_to] & walkable[dx:, y_from + dy: y_to + dy]
+        xs, ys = np.nonzero(pairs)
+        ys += y_from
+        heads.append(compact[xs + ys * width])
+        tails.append(compact[xs + dx + (ys + dy) * width])
+    a = np.concatenate(heads)
+    b = np.concatenate(tails)
+
+    parent = np.arange(len(cells), dtype=np.int32)
+    while True:
+        root_a = parent[a]
+        root_b = parent[b]
+        differ = root_a != root_b
+        if not differ.any():
+            break
+
+        # Pairs already sharing a root will keep sharing one, so drop them.
+        a, b, root_a, root_b = a[differ], b[differ], root_a[differ], root_b[differ]
+        np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    roots, component = np.unique(parent, return_inverse=True)
+    flat_labels[cells] = component + 1
+
+    return labels, len(roots)
+
+
+class ConnectivityIndex:
+    """
+    Keeps the connected components of a GameMap's walkable tiles.
+
+    The labels are computed on first use and then kept up-to-date from the map's change journal: newly walkable tiles
+    are labelled within the changed region, merging any components they join, while tiles which stop being walkable
+    force a full relabel on the next query since they may split a component. The labels reflect the map as of the last
+    journal flush.
+    """
+
+    def __init__(self, game_map: GameMap):
+        self.game_map = game_map
+        self._labels: Optional[np.ndarray] = None
+        self._next_label = 1
+        game_map.journal.subscribe(self._on_tiles_changed)
+
+    @property
+    def labels(self) -> np.ndarray:
+        """
+        Return the component label of every tile, 0 for tiles which aren't walkable.
+        """
+        if self._labels is None:
+            self._labels, count = label_components(self.game_map.tiles["walkable"])
+            self._next_label = count + 1
+        return self._labels
+
+    def fork(self, game_map: GameMap) -> ConnectivityIndex:
+        """
+        Return a copy of this index for a fork of its map, sharing the labels until either of them updates them.
+        """
+        child = shallow_copy(self)
+        child.game_map = game_map
+        if self._labels is not None:
+            share(self._labels)
+        game_map.journal.subscribe(child._on_tiles_changed)
+        return child
+
+    def invalidate(self) -> None:
+        """
+        Drop the labels, they'll be recomputed in full on the next query.
+        """
+        self._labels = None
+
+    def connected(self, start: Tuple[int, int], end: Tuple[int, int]) -> bool:
+        """
+        Return True if there is a walkable route between the two positions.
+        """
+        labels = self.labels
+        label = labels[start]
+        return bool(label) and label == labels[end]
+
+    def _on_tiles_changed(self, rects: List[Rect]) -> None:
+        if self._labels is None:
+            return
+
+        walkable = self.game_map.tiles["walkable"]
+        for x1, y1, x2, y2 in rects:
+            region = (slice(x1, x2), slice(y1, y2))
+            if (~walkable[region] & (self._labels[region] != 0)).any():
+                # Walls appeared, which might have cut a component in two.
+                self._labels = None
+                return
+            if (walkable[region] & (self._labels[region] == 0)).any():
+                self._label_region(x1, y1, x2, y2)
+
+    def _label_region(self, x1: int, y1: int, x2: int, y2: int) -> None:
+        """
+        Label the newly walkable tiles in a region, merging the components they connect.
+        """
+        labels = self._labels = own(self._labels)
+        width, height = labels.shape
+
+        # Include a border of one tile, to see which existing components the new tiles touch.
+        window = (slice(max(0, x1 - 1), min(width, x2 + 1)), slice(max(0, y1 - 1), min(height, y2 + 1)))
+        local, count = label_components(self.game_map.tiles["walkable"][window])
+        window_labels = labels[window]
+
+        for component in range(1, count + 1):
+            in_component = local == component
+            touched = np.unique(window_labels[in_component])
+            touched = touched[touched != 0]
+
+            if not len(touched):
+                target = self._next_label
+                self._next_label += 1
+            else:
+                target = touched[0]
+                if len(touched) > 1:
+                    labels[np.isin(labels, touched[1:])] = target
+
+            window_labels[in_component] = target
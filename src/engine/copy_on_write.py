@@ -0,0 +1,40 @@
+"""
+Helpers for forking game states: NumPy arrays shared between forks and copied on the first write, and cheap shallow
+copies of the objects around them.
+
+A shared array is marked read-only. Whoever wants to write to it next, the parent or any of its forks, takes their own
+copy first with 'own' and leaves the others with the original.
+"""
+from __future__ import annotations
+
+from typing import TypeVar
+
+import numpy as np  # type: ignore
+
+T = TypeVar("T")
+
+
+def share(array: np.ndarray) -> np.ndarray:
+    """
+    Mark an array as shared and return it, so that it is copied before it is next written to.
+    """
+    array.flags.writeable = False
+    return array
+
+
+def own(array: np.ndarray) -> np.ndarray:
+    """
+    Return the array itself if it isn't shared, otherwise a writable copy with the same memory layout.
+    """
+    if array.flags.writeable:
+        return array
+    return array.copy(order="K")
+
+
+def shallow_copy(obj: T) -> T:
+    """
+    Return a shallow copy of a plain object, several times faster than 'copy.copy' as it skips the pickle protocol.
+    """
+    clone = object.__new__(type(obj))
+    clone.__dict__.update(obj.__dict__)
+    return clone
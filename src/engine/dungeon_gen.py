@@ -7,6 +7,7 @@ import tcod
 
 from engine import tile_types
 from engine.game_map import GameMap
+from engine.room_graph import RoomGraph
 from entities import entity_factories
 
 if TYPE_CHECKING:
@@ -74,21 +75,40 @@ def place_entities(room: RectangularRoom, dungeon: GameMap, max_monsters: int) -
         >> place_entities(room, dungeon, max_monsters_per_room)
     """
 
-    number_of_monsters = random.randint(0, max_monsters)
+    rng = dungeon.engine.rng
+    number_of_monsters = rng.randint(0, max_monsters)
+
+    # Rooms never overlap, so the only entities that can already stand in this room are the player and the monsters
+    #   placed by this call. Checking just those keeps generation linear in the number of rooms.
+    player = dungeon.engine.player
+    occupied = {(player.x, player.y)}
 
     for i in range(number_of_monsters):
-        x = random.randint(room.x1 + 1, room.x2 - 1)
-        y = random.randint(room.y1 + 1, room.y2 - 1)
+        x = rng.randint(room.x1 + 1, room.x2 - 1)
+        y = rng.randint(room.y1 + 1, room.y2 - 1)
+
+        if (x, y) not in occupied:
+            occupied.add((x, y))
+            spawn_monster(dungeon, x, y)
+
+
+def spawn_monster(dungeon: GameMap, x: int, y: int) -> None:
+    """
+    Spawn a random monster at the given location: an orc most of the time, otherwise a troll.
 
-        if not any(entity.x == x and entity.y == y for entity in dungeon.entities):
-            if random.random() < 0.8:
-                entity_factories.orc.spawn(dungeon, x, y)
-            else:
-                entity_factories.troll.spawn(dungeon, x, y)
+    Args:
+        dungeon (GameMap): The dungeon map.
+        x (int): The x coordinate to spawn at.
+        y (int): The y coordinate to spawn at.
+    """
+    if dungeon.engine.rng.random() < 0.8:
+        entity_factories.orc.spawn(dungeon, x, y)
+    else:
+        entity_factories.troll.spawn(dungeon, x, y)
 
 
 def tunnel_between(
-        start: Tuple[int, int], end: Tuple[int, int]
+        start: Tuple[int, int], end: Tuple[int, int], rng: random.Random
 ) -> Iterator[Tuple[int, int]]:
     """
     Return an L-shaped tunnel between the start and end points.
@@ -96,6 +116,7 @@ def tunnel_between(
     Args:
         start (Tuple[int, int]): The starting point of the tunnel.
         end (Tuple[int, int]): The ending point of the tunnel.
+        rng (random.Random): The random number generator which picks the direction of the tunnel.
 
     Returns:
         Iterator[Tuple[int, int]]: A generator that yields the x, y coordinates of each point along the tunnel path.
@@ -108,7 +129,7 @@ def tunnel_between(
     x1, y1 = start
     x2, y2 = end
 
-    if random.random() < 0.5:
+    if rng.random() < 0.5:
         # Move horizontally, then vertically.
         corner_x, corner_y = x2, y1
     else:
@@ -125,6 +146,38 @@ def tunnel_between(
         yield x, y
 
 
+def tunnel_segments(
+        start: Tuple[int, int], end: Tuple[int, int], rng: random.Random
+) -> Tuple[Tuple[slice, slice], Tuple[slice, slice]]:
+    """
+    Return an L-shaped tunnel between the start and end points as two array indexes, one per leg.
+
+    This covers the same tiles as 'tunnel_between', but lets each leg be carved with a single array write.
+
+    Args:
+        start (Tuple[int, int]): The starting point of the tunnel.
+        end (Tuple[int, int]): The ending point of the tunnel.
+        rng (random.Random): The random number generator which picks the direction of the tunnel.
+
+    Returns:
+        Tuple[Tuple[slice, slice], Tuple[slice, slice]]: The 2D array indexes of the two legs of the tunnel.
+    """
+    x1, y1 = start
+    x2, y2 = end
+
+    if rng.random() < 0.5:
+        # Move horizontally, then vertically.
+        corner_x, corner_y = x2, y1
+    else:
+        # Move vertically, then horizontally.
+        corner_x, corner_y = x1, y2
+
+    return (
+        (slice(min(x1, corner_x), max(x1, corner_x) + 1), slice(min(y1, corner_y), max(y1, corner_y) + 1)),
+        (slice(min(corner_x, x2), max(corner_x, x2) + 1), slice(min(corner_y, y2), max(corner_y, y2) + 1)),
+    )
+
+
 def generate_dungeon(
         max_rooms: int,
         room_min_size: int,
@@ -172,16 +225,18 @@ def generate_dungeon(
         raise ValueError("Maximum room size must be greater than or equal to minimum room size.")
 
     player = engine.player
+    rng = engine.rng
     dungeon = GameMap(engine, map_width, map_height, entities=[player])
 
     rooms: List[RectangularRoom] = []
+    room_graph = RoomGraph(dungeon)
 
     for room in range(max_rooms):
-        room_width = random.randint(room_min_size, room_max_size)
-        room_height = random.randint(room_min_size, room_max_size)
+        room_width = rng.randint(room_min_size, room_max_size)
+        room_height = rng.randint(room_min_size, room_max_size)
 
-        x = random.randint(0, dungeon.width - room_width - 1)
-        y = random.randint(0, dungeon.height - room_height - 1)
+        x = rng.randint(0, dungeon.width - room_width - 1)
+        y = rng.randint(0, dungeon.height - room_height - 1)
 
         # Create a new rectangular room with the dimensions (random width and height and random position).
         new_room = RectangularRoom(x, y, room_width, room_height)
@@ -195,16 +250,19 @@ def generate_dungeon(
             continue  # This room intersects -> continue (skip the rest of the loop) to the next attempt.
 
         # Set the room's inner tiles to be floor.
-        dungeon.tiles[new_room.inner] = tile_types.floor
+        dungeon.set_tiles(new_room.inner, tile_types.floor)
+        room_index = room_graph.add_room(new_room)
 
         if len(rooms) == 0:
             # The first room, where the player starts
             player.place(*new_room.center, dungeon)
         else:
             # All rooms after the first.
-            # Dig a tunnel between this room and the previous one.
-            for x, y in tunnel_between(rooms[-1].center, new_room.center):
-                dungeon.tiles[x, y] = tile_types.floor
+            # Dig a tunnel between this room and the previous one, a leg at a time.
+            legs = tunnel_segments(rooms[-1].center, new_room.center, rng)
+            for leg in legs:
+                dungeon.set_tiles(leg, tile_types.floor)
+            room_graph.add_corridor(room_index - 1, room_index, legs)
 
         # Place monsters in the room.
         place_entities(new_room, dungeon, max_monsters_per_room)
@@ -212,4 +270,9 @@ def generate_dungeon(
         # Finally, append the new room to the list.
         rooms.append(new_room)
 
+    dungeon.room_graph = room_graph
+
+    # A freshly generated map has no history for incremental consumers to catch up on.
+    dungeon.journal.clear()
+
     return dungeon
@@ -2,62 +2,172 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import random
+from typing import List, Optional, Tuple, TYPE_CHECKING, Union
 
 from tcod.console import Console
 from tcod.context import Context
 from tcod.map import compute_fov
 
 from engine.input_handler import EventHandler
+from engine.message_log import MessageLog
 
 if TYPE_CHECKING:
+    from engine.ansi_renderer import AnsiRenderer
+    from engine.change_journal import Rect
     from entities.entity import Entity
     from engine.game_map import GameMap
 
+FOV_RADIUS = 8
+
 
 class Engine:
     """
     The main game engine class that holds and operates on the game state.
     """
 
-    game_map: GameMap
-
-    def __init__(self, player: Entity):
+    def __init__(self, player: Entity, rng: Optional[random.Random] = None):
         """
         Initializes a new Engine object.
         :param player: Entity The player entity.
+        :param rng: The random number generator for everything in this game. Engines don't share any global state, so
+            several games can run side by side, each reproducible from its own seed.
         """
         self.event_handler = EventHandler(self)
         self.player = player
+        self.rng = rng if rng is not None else random.Random()
+        self.message_log = MessageLog()
+
+        # The position the current FOV was computed from, or None if it must be recomputed.
+        self._fov_origin: Optional[Tuple[int, int]] = None
+        # The window of the map the current FOV covers, cleared from 'visible' before the next one is merged in.
+        self._fov_window: Optional[Rect] = None
+
+    @property
+    def game_map(self) -> GameMap:
+        """
+        Return the map currently being played.
+        """
+        return self._game_map
+
+    @game_map.setter
+    def game_map(self, game_map: GameMap) -> None:
+        """
+        Switch to a new map, subscribing the engine's caches to its change journal.
+        """
+        old_map: Optional[GameMap] = getattr(self, "_game_map", None)
+        if old_map is not None:
+            old_map.journal.unsubscribe(self._on_tiles_changed)
+
+        self._game_map = game_map
+        game_map.journal.subscribe(self._on_tiles_changed)
+        self._fov_origin = None
+        self._fov_window = None
+
+    def fork(self) -> Engine:
+        """
+        Return a child engine holding a copy of this game, to play out a "what if" branch without touching this one.
+
+        Forking is cheap: the map's arrays are shared until written to, and entities are shallow copies. The child
+        starts with a copy of this engine's random state, so a branch replays the same way every time, and with an
+        empty message log.
+        """
+        rng = random.Random()
+        rng.setstate(self.rng.getstate())
+        child = Engine(player=self.player, rng=rng)
+        child.game_map = self.game_map.fork(child)  # Also points 'child.player' at the player's copy.
+        child._fov_origin, child._fov_window = self._fov_origin, self._fov_window
+        return child
+
+    def _on_tiles_changed(self, rects: List[Rect]) -> None:
+        """
+        Invalidate the cached FOV if any changed region lies within its radius.
+        """
+        if self._fov_origin is None:
+            return
+
+        origin_x, origin_y = self._fov_origin
+        for x1, y1, x2, y2 in rects:
+            if (
+                    x1 <= origin_x + FOV_RADIUS
+                    and x2 > origin_x - FOV_RADIUS
+                    and y1 <= origin_y + FOV_RADIUS
+                    and y2 > origin_y - FOV_RADIUS
+            ):
+                self._fov_origin = None
+                return
+
+    def end_turn(self) -> None:
+        """
+        Finish the current turn: let the enemies act, hand this turn's tile changes to their consumers and update the
+        FOV before the players next action.
+
+        The journal is flushed before the enemies act as well, so that they path over the tiles as the player left them.
+        """
+        self.game_map.journal.flush()
+        self.handle_enemy_turns()
+        self.game_map.journal.flush()
+        self.update_fov()
 
     def handle_enemy_turns(self) -> None:
         """
         Handle the turns of all entities that are not the player.
         """
-        for entity in set(self.game_map.actors) - {self.player}:
+        for entity in self.game_map.living_actors - {self.player}:
             if entity.ai:
                 entity.ai.perform()
 
     def update_fov(self) -> None:
-        """Recompute the visible area based on the players point of view."""
-        self.game_map.visible[:] = compute_fov(
-            self.game_map.tiles["transparent"],
-            (self.player.x, self.player.y),
-            radius=8,
+        """
+        Recompute the visible area based on the players point of view.
+
+        The FOV is only recomputed when the player has moved or the tiles around them have changed. Nothing beyond
+        FOV_RADIUS can be seen, so it is computed on the window around the player and only that window of the packed
+        masks is touched, however large the map.
+        """
+        origin = (self.player.x, self.player.y)
+        if origin == self._fov_origin:
+            return
+
+        game_map = self.game_map
+        x, y = origin
+        x1, y1 = max(0, x - FOV_RADIUS), max(0, y - FOV_RADIUS)
+        x2, y2 = min(game_map.width, x + FOV_RADIUS + 1), min(game_map.height, y + FOV_RADIUS + 1)
+
+        fov = compute_fov(
+            game_map.tiles["transparent"][x1:x2, y1:y2],
+            (x - x1, y - y1),
+            radius=FOV_RADIUS,
         )
+
+        if self._fov_window is not None:
+            game_map.visible.clear(*self._fov_window)
+        game_map.visible.merge(x1, y1, fov)
+        self._fov_origin = origin
+        self._fov_window = (x1, y1, x2, y2)
+
         # If a tile is "visible" it should be added to "explored".
-        self.game_map.explored |= self.game_map.visible
+        game_map.explored.merge(x1, y1, fov)
 
-    def render(self, console: Console, context: Context) -> None:
+    def render(self, console: Console, context: Union[Context, AnsiRenderer]) -> None:
         """
         Render the entities to the console.
         :param console:
-        :param context:
+        :param context: Where the frame is presented, a tcod window or, headless, an AnsiRenderer.
 
         :return: None
         """
         self.game_map.render(console)
 
+        # The log panel fills the rows below the map.
+        self.message_log.render(
+            console=console,
+            x=0,
+            y=self.game_map.height,
+            width=console.width,
+            height=console.height - self.game_map.height,
+        )
+
         context.present(console)
 
         console.clear()
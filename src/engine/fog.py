@@ -0,0 +1,114 @@
+"""
+This module contains the FogMask class, a bit-packed boolean mask used for the visible and explored tiles of a map.
+"""
+from __future__ import annotations
+
+from typing import Tuple, Union
+
+import numpy as np  # type: ignore
+
+from engine.copy_on_write import own, shallow_copy, share
+
+
+def _normalize(index: int, size: int, axis: str) -> int:
+    """
+    Return a coordinate along an axis of the given size, counting negative ones back from the end.
+    """
+    index = int(index)
+    if not -size <= index < size:
+        raise IndexError(f"{axis} index {index} is out of bounds for size {size}")
+    return index + size if index < 0 else index
+
+
+class FogMask:
+    """
+    A boolean mask over a map, packed 8 tiles to a byte.
+
+    Each byte holds 8 consecutive x coordinates of one row, lowest x in the lowest bit. Windows of the mask are packed
+    and unpacked on demand, so updating or reading the area around the player costs in proportion to that area rather
+    than to the whole map.
+    """
+
+    def __init__(self, width: int, height: int):
+        """
+        Initializes a new FogMask with every tile unset.
+        """
+        self.width, self.height = width, height
+        self.bits = np.zeros(((width + 7) // 8, height), dtype=np.uint8, order="F")
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Return the memory used by the mask's bits.
+        """
+        return self.bits.nbytes
+
+    def fork(self) -> FogMask:
+        """
+        Return a copy of this mask which shares its bits until either of them is written to.
+        """
+        share(self.bits)
+        return shallow_copy(self)
+
+    def __getitem__(self, key: Tuple[Union[int, slice], Union[int, slice]]) -> Union[bool, np.ndarray]:
+        """
+        Return the value of a single tile for 'mask[x, y]', or an unpacked boolean array for 'mask[x1:x2, y1:y2]'.
+
+        Negative coordinates count back from the far edge like they do for NumPy arrays, and coordinates out of bounds
+        raise an IndexError rather than reading the padding bits of the last byte.
+        """
+        x, y = key
+        if not isinstance(x, slice):
+            x = _normalize(x, self.width, "x")
+        if not isinstance(y, slice):
+            y = _normalize(y, self.height, "y")
+        if isinstance(x, slice) or isinstance(y, slice):
+            x1, x2, _ = (x if isinstance(x, slice) else slice(x, x + 1)).indices(self.width)
+            y1, y2, _ = (y if isinstance(y, slice) else slice(y, y + 1)).indices(self.height)
+            return self.unpack(x1, y1, x2, y2)
+
+        return bool((self.bits[x >> 3, y] >> (x & 7)) & 1)
+
+    def unpack(self, x1: int, y1: int, x2: int, y2: int) -> np.ndarray:
+        """
+        Return a window of the mask as a boolean array of shape (x2 - x1, y2 - y1).
+        """
+        first_byte = x1 >> 3
+        window = np.unpackbits(self.bits[first_byte: (x2 + 7) >> 3, y1:y2], axis=0, bitorder="little")
+        offset = x1 - first_byte * 8
+        return window[offset: offset + x2 - x1].view(bool)
+
+    def to_array(self) -> np.ndarray:
+        """
+        Return the whole mask as a boolean array.
+        """
+        return self.unpack(0, 0, self.width, self.height)
+
+    def merge(self, x: int, y: int, mask: np.ndarray) -> None:
+        """
+        Set every tile which is True in 'mask', placed with its top-left corner at (x, y). Other tiles are unchanged.
+        """
+        first_byte, packed = self._pack(x, mask)
+        self.bits = own(self.bits)
+        self.bits[first_byte: first_byte + packed.shape[0], y: y + mask.shape[1]] |= packed
+
+    def clear(self, x1: int, y1: int, x2: int, y2: int) -> None:
+        """
+        Unset every tile in a window.
+        """
+        if x1 >= x2 or y1 >= y2:
+            return
+        first_byte, packed = self._pack(x1, np.ones((x2 - x1, y2 - y1), dtype=bool))
+        self.bits = own(self.bits)
+        self.bits[first_byte: first_byte + packed.shape[0], y1:y2] &= ~packed
+
+    @staticmethod
+    def _pack(x: int, mask: np.ndarray) -> Tuple[int, np.ndarray]:
+        """
+        Pack a boolean window starting at column x into whole bytes, returning the first byte's index and the bytes.
+        """
+        offset = x & 7
+        width = mask.shape[0]
+        aligned = np.zeros(((offset + width + 7) // 8 * 8, mask.shape[1]), dtype=bool)
+        aligned[offset: offset + width] = mask
+        return x >> 3, np.packbits(aligned, axis=0, bitorder="little")
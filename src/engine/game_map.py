@@ -3,18 +3,44 @@ This module contains the GameMap class.
 """
 from __future__ import annotations
 
-from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING, Union
 
 import numpy as np  # type: ignore
 from tcod.console import Console
 
 from engine import tile_types
+from engine.change_journal import ChangeJournal
+from engine.copy_on_write import own, share
+from engine.fog import FogMask
+from engine.lighting import LightMap
 from entities.entity import Actor
 
 if TYPE_CHECKING:
+    from engine.connectivity import ConnectivityIndex
     from engine.engine import Engine
+    from engine.room_graph import RoomGraph
     from entities.entity import Entity
 
+# An index into one axis of the tile array, either a single coordinate or a slice.
+AxisIndex = Union[int, slice]
+
+
+def _axis_bounds(index: AxisIndex, size: int) -> Tuple[int, int]:
+    """
+    Return the half-open range of coordinates an index into an axis of the given size covers.
+    """
+    if isinstance(index, slice):
+        covered = range(*index.indices(size))
+        if not covered:
+            return 0, 0
+        return min(covered[0], covered[-1]), max(covered[0], covered[-1]) + 1
+
+    index = int(index)
+    if index < 0:
+        index += size
+    return index, index + 1
+
 
 class GameMap:
     """
@@ -34,11 +60,163 @@ class GameMap:
         """
         self.engine = engine
         self.width, self.height = width, height
-        self.entities = set(entities)
+        self._init_entities(entities)
         self.tiles = np.full((width, height), fill_value=tile_types.wall, order="F")
+        # The cost of walking onto each tile, 1 for walkable tiles and 0 for blocked ones. Kept in step with 'tiles'.
+        self.walk_cost = np.zeros((width, height), dtype=np.int8, order="F")
+        self.journal = ChangeJournal()  # Regions of 'tiles' changed this turn, see 'set_tiles'.
+        self._connectivity: Optional[ConnectivityIndex] = None  # Created on first use, see 'connectivity'.
+        self.room_graph: Optional[RoomGraph] = None  # Set by generators which build the map out of rooms.
+        self.lighting = LightMap(self)  # Light sources, shading the visible tiles when there are any.
+
+        # Bit-packed, so that the masks stay small on huge maps.
+        self.visible = FogMask(width, height)  # Tiles the player can currently see
+        self.explored = FogMask(width, height)  # Tiles the player has seen before
+
+    def fork(self, engine: Engine) -> GameMap:
+        """
+        Return a copy of this map for a forked engine.
+
+        The tile arrays and the visible and explored masks are shared with this map until either map writes to them,
+        and every entity gets a shallow copy of its own. The copy of this map's player becomes the forked engine's
+        player.
+        """
+        child = GameMap.__new__(GameMap)
+        child.engine = engine
+        child.width, child.height = self.width, self.height
+        child.tiles = share(self.tiles)
+        child.walk_cost = share(self.walk_cost)
+        child.journal = ChangeJournal()
+        child.journal.rects = list(self.journal.rects)
+        child._connectivity = self._connectivity.fork(child) if self._connectivity else None
+        child.room_graph = self.room_graph.fork(child) if self.room_graph else None
+        child.lighting = self.lighting.fork(child)
+        child.visible = self.visible.fork()
+        child.explored = self.explored.fork()
+
+        # The clones stand where the originals do, so the occupancy grid is shared too.
+        child._init_entities((), occupancy=share(self.occupancy))
+        for entity in self.entities:
+            clone = entity.fork(child)
+            child.entities.add(clone)
+            child._registry_for(clone).add(clone)
+            if clone.light:
+                child.light_carriers.add(clone)
+            position = self._blocker_positions.get(entity)
+            if position is not None:
+                child._track_blocker(clone, position)
+            if entity is self.engine.player:
+                engine.player = clone
+
+        return child
+
+    @property
+    def connectivity(self) -> ConnectivityIndex:
+        """
+        Return the connected components of the walkable tiles.
+
+        The index, and the module it lives in, are only loaded the first time something asks whether two positions are
+        connected, which is after the first frame. It labels the tiles as they are then, so it needs no history.
+        """
+        if self._connectivity is None:
+            from engine.connectivity import ConnectivityIndex
+
+            self._connectivity = ConnectivityIndex(self)
+        return self._connectivity
+
+    def _init_entities(self, entities: Iterable[Entity], occupancy: Optional[np.ndarray] = None) -> None:
+        """
+        Start the set of all entities, the typed registries which split it up and the index of blocking entities.
+
+        Every entity is in exactly one registry, so that queries only walk the kind of entity they are after.
+        """
+        self.entities: Set[Entity] = set()
+        self.living_actors: Set[Actor] = set()
+        self.corpses: Set[Actor] = set()
+        self.props: Set[Entity] = set()  # Anything else which doesn't block movement, like decorations.
+        self.obstacles: Set[Entity] = set()  # Anything else which blocks movement.
+        self.light_carriers: Set[Entity] = set()  # Entities which had a light when they were added.
+
+        # The number of blocking entities on each tile, and which ones they are, kept up-to-date as entities are added,
+        #   removed and moved. Lookups by position cost the same however many entities there are.
+        if occupancy is None:
+            occupancy = np.zeros((self.width, self.height), dtype=np.int8, order="F")
+        self.occupancy = occupancy
+        self._blocker_positions: Dict[Entity, Tuple[int, int]] = {}
+        self._blockers_at: Dict[Tuple[int, int], List[Entity]] = {}
+
+        for entity in entities:
+            self.add_entity(entity)
+
+    def _registry_for(self, entity: Entity) -> Set:
+        """
+        Return the registry an entity belongs in, given its current state.
+        """
+        if isinstance(entity, Actor):
+            return self.living_actors if entity.is_alive else self.corpses
+        return self.obstacles if entity.blocks_movement else self.props
+
+    def add_entity(self, entity: Entity) -> None:
+        """
+        Add an entity to this map and to its registry.
+
+        Adding an entity which is already on the map files it again under its current state and position, as generators
+        do when they place a player the map was created with.
+        """
+        if entity in self.entities:
+            self.remove_entity(entity)
+
+        self.entities.add(entity)
+        self._registry_for(entity).add(entity)
+        if entity.light:
+            self.light_carriers.add(entity)
+        if entity.blocks_movement:
+            self._occupy(entity)
 
-        self.visible = np.full((width, height), fill_value=False, order="F")  # Tiles the player can currently see
-        self.explored = np.full((width, height), fill_value=False, order="F")  # Tiles the player has seen before
+    def remove_entity(self, entity: Entity) -> None:
+        """
+        Remove an entity from this map and from its registry.
+        """
+        self.entities.remove(entity)
+        for registry in (self.living_actors, self.corpses, self.props, self.obstacles):
+            registry.discard(entity)
+        self.light_carriers.discard(entity)
+        if entity in self._blocker_positions:
+            self._vacate(entity)
+
+    def entity_moved(self, entity: Entity) -> None:
+        """
+        Update the index of blocking entities after an entity on this map changed position.
+        """
+        if entity in self._blocker_positions:
+            self._vacate(entity)
+            self._occupy(entity)
+
+    def _occupy(self, entity: Entity) -> None:
+        self.occupancy = own(self.occupancy)
+        self.occupancy[entity.x, entity.y] += 1
+        self._track_blocker(entity, (entity.x, entity.y))
+
+    def _vacate(self, entity: Entity) -> None:
+        position = self._blocker_positions.pop(entity)
+        self.occupancy = own(self.occupancy)
+        self.occupancy[position] -= 1
+
+        blockers = self._blockers_at[position]
+        blockers.remove(entity)
+        if not blockers:
+            del self._blockers_at[position]
+
+    def _track_blocker(self, entity: Entity, position: Tuple[int, int]) -> None:
+        self._blocker_positions[entity] = position
+        self._blockers_at.setdefault(position, []).append(entity)
+
+    def reclassify(self, entity: Entity) -> None:
+        """
+        Move an entity to the right registry after a change to what it is, like an actor dying or picking up a light.
+        """
+        self.remove_entity(entity)
+        self.add_entity(entity)
 
     @property
     def actors(self) -> Iterator[Actor]:
@@ -46,10 +224,7 @@ class GameMap:
         Iterate over the maps living actors.
         :return:
         """
-        yield from (
-            entity for entity in self.entities
-            if isinstance(entity, Actor) and entity.is_alive
-        )
+        yield from self.living_actors
 
     def get_blocking_entity_at_location(self, location_x: int, location_y: int) -> Optional[Entity]:
         """
@@ -63,28 +238,56 @@ class GameMap:
             Optional[Entity]: The blocking entity at the given location, if one exists.
             None: If no blocking entity is found at the given location.
         """
-
-        # TODO: Modify this so that we only check the entities within a given radius as the game map may become large
-        for entity in self.entities:
-            if entity.blocks_movement and entity.x == location_x and entity.y == location_y:
-                return entity
-
-        return None
+        blockers = self._blockers_at.get((location_x, location_y))
+        return blockers[0] if blockers else None
 
     def get_actor_at_location(self, x: int, y: int) -> Optional[Actor]:
         """
-        Get the actor at a specific location.
+        Get the living actor at a specific location.
+
+        Living actors block movement, so only the blocking entities indexed at the location are checked.
         :param x:
         :param y:
         :return:
         """
-        # TODO: Modify this so that we only check the entities within a given radius as the game map may become large
-        for actor in self.actors:
-            if actor.x == x and actor.y == y:
-                return actor
+        for entity in self._blockers_at.get((x, y), ()):
+            if entity in self.living_actors:
+                return entity  # type: ignore
 
         return None
 
+    def set_tiles(self, index: Union[Tuple[AxisIndex, AxisIndex], np.ndarray], tile: np.ndarray) -> None:
+        """
+        Set the tiles at the given index and record the changed region in the journal.
+
+        All writes to 'tiles' should go through this method, so that consumers subscribed to 'journal' can keep up with
+        the map incrementally.
+
+        Args:
+            index (Union[Tuple[AxisIndex, AxisIndex], np.ndarray]): The x and y index to set, each either a coordinate
+                or a slice, or a boolean mask the size of the map.
+            tile (np.ndarray): The tile, or an array of tiles matching the shape of the index.
+
+        Returns:
+            None
+        """
+        self.tiles = own(self.tiles)
+        self.walk_cost = own(self.walk_cost)
+        self.tiles[index] = tile
+        self.walk_cost[index] = self.tiles["walkable"][index]
+
+        if isinstance(index, np.ndarray):
+            # Record the bounding box of the mask.
+            columns = np.flatnonzero(index.any(axis=1))
+            rows = np.flatnonzero(index.any(axis=0))
+            if len(columns):
+                self.journal.record(int(columns[0]), int(rows[0]), int(columns[-1]) + 1, int(rows[-1]) + 1)
+            return
+
+        x1, x2 = _axis_bounds(index[0], self.width)
+        y1, y2 = _axis_bounds(index[1], self.height)
+        self.journal.record(x1, y1, x2, y2)
+
     def in_bounds(self, x: int, y: int) -> bool:
         """
         Returns True if the given x and y coordinates are within the bounds of the map.
@@ -106,18 +309,36 @@ class GameMap:
         If it isn't, but it's in the "explored" array, then draw it with the "dark" colors.
         Otherwise, the default is "SHROUD".
 
+        Only the part of the map which fits on the console is drawn, and only that window of the masks is unpacked.
+
+        If the map has lights, each visible tile is blended from its "dark" colors towards its "light" colors by the
+        light level of the tile, in a single vectorized step over the window.
+
         Args:
             console (Console): The console to render the map onto.
 
         Returns:
             None
         """
-        console.tiles_rgb[0: self.width, 0: self.height] = np.select(
-            condlist=[self.visible, self.explored],
-            choicelist=[self.tiles["light"], self.tiles["dark"]],
+        width, height = min(self.width, console.width), min(self.height, console.height)
+        tiles = self.tiles[0:width, 0:height]
+
+        lit = tiles["light"]
+        if self.lighting.has_lights():
+            levels = self.lighting.levels(0, 0, width, height)
+            dark = tiles["dark"]
+            lit = lit.copy()
+            for field in ("fg", "bg"):
+                base = dark[field].astype(np.float32)
+                lit[field] = base + (tiles["light"][field] - base) * levels
+
+        console.tiles_rgb[0:width, 0:height] = np.select(
+            condlist=[self.visible.unpack(0, 0, width, height), self.explored.unpack(0, 0, width, height)],
+            choicelist=[lit, tiles["dark"]],
             default=tile_types.SHROUD
         )
 
-        for entity in self.entities:
-            if self.visible[entity.x, entity.y]:
+        # Draw registry by registry, so that living actors end up on top of the corpses they stand on.
+        for entity in chain(self.props, self.corpses, self.obstacles, self.living_actors):
+            if entity.x < width and entity.y < height and self.visible[entity.x, entity.y]:
                 console.print(x=entity.x, y=entity.y, string=entity.char, fg=entity.color)
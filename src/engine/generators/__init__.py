@@ -0,0 +1,71 @@
+"""
+Pluggable dungeon generators.
+
+Every generator is configured when it's constructed and builds a new GameMap for an engine with 'generate'. Use
+'GENERATORS' to look one up by name. Each generator lives in its own module, which is only imported once it's looked
+up, so starting a game doesn't load the generators it doesn't use.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import Dict, Iterator, Mapping, Type, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from engine.engine import Engine
+    from engine.game_map import GameMap
+
+
+class DungeonGenerator:
+    """
+    Base class for all dungeon generators.
+    """
+
+    def __init__(self, map_width: int, map_height: int):
+        self.map_width = map_width
+        self.map_height = map_height
+
+    def generate(self, engine: Engine) -> GameMap:
+        """
+        Generate a new map of 'map_width' by 'map_height' tiles and place the engine's player on it.
+
+        This method must be overriden by DungeonGenerator subclasses.
+
+        :param engine: The game engine the map belongs to.
+        :return: The generated map.
+        """
+        raise NotImplementedError()
+
+
+class GeneratorRegistry(Mapping[str, Type[DungeonGenerator]]):
+    """
+    Generator classes by name, each imported from its module the first time it's looked up.
+
+    Listing or checking the names doesn't import anything.
+    """
+
+    def __init__(self, classes: Dict[str, str]):
+        """
+        Initializes a new GeneratorRegistry.
+        :param classes: The 'module:class' path of the generator class for every name.
+        """
+        self._classes = classes
+
+    def __getitem__(self, name: str) -> Type[DungeonGenerator]:
+        module, _, cls = self._classes[name].partition(":")
+        return getattr(importlib.import_module(module), cls)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._classes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._classes)
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+
+GENERATORS = GeneratorRegistry({
+    "rooms": "engine.generators.rooms:RoomsAndCorridorsGenerator",
+    "bsp": "engine.generators.bsp:BSPGenerator",
+    "caves": "engine.generators.caves:CaveGenerator",
+})
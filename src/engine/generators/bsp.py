@@ -0,0 +1,99 @@
+"""
+The binary space partition generator.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, TYPE_CHECKING
+
+import tcod
+
+from engine import tile_types
+from engine.dungeon_gen import RectangularRoom, place_entities, tunnel_segments
+from engine.game_map import GameMap
+from engine.generators import DungeonGenerator
+from engine.room_graph import RoomGraph
+
+if TYPE_CHECKING:
+    from engine.engine import Engine
+
+
+class BSPGenerator(DungeonGenerator):
+    """
+    Rooms placed in the leaves of a binary space partition, with each pair of sibling partitions joined by a tunnel.
+    """
+
+    def __init__(
+            self,
+            map_width: int,
+            map_height: int,
+            max_monsters_per_room: int = 2,
+            room_min_size: int = 6,
+            leaf_size: int = 12,
+    ):
+        if room_min_size < 1:
+            raise ValueError("Minimum room size must be greater than 0.")
+        if leaf_size < room_min_size:
+            raise ValueError("Leaf size must be greater than or equal to minimum room size.")
+        # The last row and column are left as wall, so a room needs one tile more than its size in each direction.
+        if min(map_width, map_height) - 1 < room_min_size:
+            raise ValueError("Map must be larger than the minimum room size in both directions.")
+
+        super().__init__(map_width, map_height)
+        self.max_monsters_per_room = max_monsters_per_room
+        self.room_min_size = room_min_size
+        self.leaf_size = leaf_size
+
+    def generate(self, engine: Engine) -> GameMap:
+        player = engine.player
+        rng = engine.rng
+        dungeon = GameMap(engine, self.map_width, self.map_height, entities=[player])
+
+        # Leave the last row and column as wall, rooms only carve out their inner area.
+        root = tcod.bsp.BSP(x=0, y=0, width=self.map_width - 1, height=self.map_height - 1)
+        root.split_recursive(
+            depth=32,  # Splitting stops once the leaves reach 'leaf_size', not at this depth.
+            min_width=self.leaf_size,
+            min_height=self.leaf_size,
+            max_horizontal_ratio=1.5,
+            max_vertical_ratio=1.5,
+            seed=tcod.random.Random(tcod.random.MERSENNE_TWISTER, rng.getrandbits(31)),
+        )
+
+        rooms: List[RectangularRoom] = []
+        room_graph = RoomGraph(dungeon)
+        # The index of the room standing in for each partition, used to connect it to its sibling.
+        representative: Dict[tcod.bsp.BSP, int] = {}
+
+        for node in root.post_order():
+            if node.children:
+                left, right = (representative[child] for child in node.children)
+                legs = tunnel_segments(rooms[left].center, rooms[right].center, rng)
+                for leg in legs:
+                    dungeon.set_tiles(leg, tile_types.floor)
+                room_graph.add_corridor(left, right, legs)
+                representative[node] = left
+                continue
+
+            room_width = rng.randint(self.room_min_size, node.width)
+            room_height = rng.randint(self.room_min_size, node.height)
+            room = RectangularRoom(
+                rng.randint(node.x, node.x + node.width - room_width),
+                rng.randint(node.y, node.y + node.height - room_height),
+                room_width,
+                room_height,
+            )
+            dungeon.set_tiles(room.inner, tile_types.floor)
+
+            if rooms:
+                place_entities(room, dungeon, self.max_monsters_per_room)
+            else:
+                # The first room, where the player starts.
+                player.place(*room.center, dungeon)
+
+            representative[node] = room_graph.add_room(room)
+            rooms.append(room)
+
+        dungeon.room_graph = room_graph
+        dungeon.journal.clear()
+
+        return dungeon
@@ -0,0 +1,126 @@
+"""
+The cellular automaton cave generator.
+"""
+from __future__ import annotations
+
+from typing import Set, Tuple, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+
+from engine import tile_types
+from engine.connectivity import label_components
+from engine.dungeon_gen import spawn_monster
+from engine.game_map import GameMap
+from engine.generators import DungeonGenerator
+
+if TYPE_CHECKING:
+    from engine.engine import Engine
+
+# How many times to carve the cave again when the noise leaves no floor at all, before giving up.
+MAX_CARVE_ATTEMPTS = 10
+
+
+def count_neighbours(mask: np.ndarray, outside: bool = True) -> np.ndarray:
+    """
+    Return the number of set cells among the 8 neighbours of every cell in a boolean array.
+
+    The count is the sum of the 8 shifted views of the padded array, so the whole map is handled in a few vectorized
+    operations.
+
+    Args:
+        mask (np.ndarray): The boolean array to count.
+        outside (bool): The value cells outside the array count as.
+
+    Returns:
+        np.ndarray: An uint8 array with the same shape as 'mask'.
+    """
+    width, height = mask.shape
+    padded = np.pad(mask, 1, constant_values=outside).view(np.uint8)
+
+    counts = np.zeros((width, height), dtype=np.uint8, order="F")
+    for dx in (0, 1, 2):
+        for dy in (0, 1, 2):
+            if dx != 1 or dy != 1:
+                counts += padded[dx: dx + width, dy: dy + height]
+
+    return counts
+
+
+class CaveGenerator(DungeonGenerator):
+    """
+    Organic caves grown with a cellular automaton.
+
+    The map starts as random noise and is smoothed by repeatedly turning each cell into a wall when enough of its
+    neighbours are walls. Each step works on the whole map at once with NumPy. Only the largest connected cave is kept.
+    """
+
+    def __init__(
+            self,
+            map_width: int,
+            map_height: int,
+            wall_probability: float = 0.45,
+            iterations: int = 4,
+            tiles_per_monster: int = 150,
+    ):
+        super().__init__(map_width, map_height)
+        self.wall_probability = wall_probability
+        self.iterations = iterations
+        self.tiles_per_monster = tiles_per_monster
+
+    def carve(self, rng: np.random.Generator) -> np.ndarray:
+        """
+        Return a boolean array which is True for the cave's floor.
+        """
+        walls = rng.random((self.map_width, self.map_height), dtype=np.float32) < self.wall_probability
+        walls = np.asfortranarray(walls)
+
+        for _ in range(self.iterations):
+            # A cell is a wall if 5 or more of its neighbours are walls, or if it already is one and 4 are.
+            neighbours = count_neighbours(walls)
+            walls = (neighbours >= 5) | (walls & (neighbours == 4))
+
+        # Keep a solid border so nothing can walk off the map.
+        walls[[0, -1], :] = True
+        walls[:, [0, -1]] = True
+
+        # Fill in every pocket except the largest cave, so that the whole map is reachable.
+        labels, count = label_components(~walls)
+        if count > 1:
+            largest = np.argmax(np.bincount(labels.ravel(order="F"))[1:]) + 1
+            return labels == largest
+
+        return ~walls
+
+    def generate(self, engine: Engine) -> GameMap:
+        player = engine.player
+        rng = engine.rng
+
+        for _ in range(MAX_CARVE_ATTEMPTS):
+            floor = self.carve(np.random.default_rng(rng.getrandbits(64)))
+            if floor.any():
+                break
+        else:
+            raise ValueError(
+                f"No cave floor was carved in {MAX_CARVE_ATTEMPTS} attempts, the map is too small or "
+                f"'wall_probability' too high."
+            )
+
+        dungeon = GameMap(engine, self.map_width, self.map_height, entities=[player])
+        dungeon.set_tiles(floor, tile_types.floor)
+
+        floor_x, floor_y = np.nonzero(floor)
+        start = rng.randrange(len(floor_x))
+        player.place(int(floor_x[start]), int(floor_y[start]), dungeon)
+
+        # Monsters go on distinct floor tiles, away from the player's starting tile.
+        occupied: Set[Tuple[int, int]] = {(player.x, player.y)}
+        for _ in range(len(floor_x) // self.tiles_per_monster):
+            i = rng.randrange(len(floor_x))
+            x, y = int(floor_x[i]), int(floor_y[i])
+            if (x, y) not in occupied:
+                occupied.add((x, y))
+                spawn_monster(dungeon, x, y)
+
+        dungeon.journal.clear()
+
+        return dungeon
@@ -0,0 +1,45 @@
+"""
+The rooms and corridors generator.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from engine.dungeon_gen import generate_dungeon
+from engine.generators import DungeonGenerator
+
+if TYPE_CHECKING:
+    from engine.engine import Engine
+    from engine.game_map import GameMap
+
+
+class RoomsAndCorridorsGenerator(DungeonGenerator):
+    """
+    Random non-overlapping rectangular rooms chained together by L-shaped tunnels, see 'generate_dungeon'.
+    """
+
+    def __init__(
+            self,
+            map_width: int,
+            map_height: int,
+            max_monsters_per_room: int = 2,
+            max_rooms: int = 30,
+            room_min_size: int = 6,
+            room_max_size: int = 10,
+    ):
+        super().__init__(map_width, map_height)
+        self.max_monsters_per_room = max_monsters_per_room
+        self.max_rooms = max_rooms
+        self.room_min_size = room_min_size
+        self.room_max_size = room_max_size
+
+    def generate(self, engine: Engine) -> GameMap:
+        return generate_dungeon(
+            max_rooms=self.max_rooms,
+            room_min_size=self.room_min_size,
+            room_max_size=self.room_max_size,
+            map_width=self.map_width,
+            map_height=self.map_height,
+            max_monsters_per_room=self.max_monsters_per_room,
+            engine=engine,
+        )
@@ -3,12 +3,12 @@ The input handler file.
 """
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
 import tcod.event
+from tcod.context import Context
 
-# TODO: this is a nasty import, figure this out later.
-from commands.actions import *
+from commands.actions import Action, BumpAction, EscapeAction, WaitAction
 
 if TYPE_CHECKING:
     from engine.engine import Engine
@@ -57,26 +57,56 @@ WAIT_KEYS = {
     tcod.event.K_CLEAR,
 }
 
+EXPLORE_KEYS = {
+    tcod.event.K_o,
+    tcod.event.K_x,
+}
+
 
 class EventHandler(tcod.event.EventDispatch[Action]):
     def __init__(self, engine: Engine):
         self.engine = engine
 
-    def handle_events(self) -> None:
+    def handle_events(self, context: Context) -> None:
         for event in tcod.event.wait():
-            action = self.dispatch(event)
+            # Convert mouse positions from pixels to tiles, for travel by clicking.
+            self.handle_action(self.dispatch(context.convert_event(event)))
 
-            if action is None:
-                continue
+    def handle_action(self, action: Optional[Action]) -> None:
+        """
+        Perform the player's action and finish the turn.
 
-            action.perform()
+        This is the whole turn, separate from the tcod event loop so that games can also be driven by other sources of
+        input, like a network session.
+        """
+        if action is None:
+            return
+
+        action.perform()
+
+        self.engine.end_turn()
 
-            self.engine.handle_enemy_turns()
-            self.engine.update_fov()  # Update the FOV before the players next action.
+        # Actions which take many turns carry on here rather than going back to the event loop, so no frames are drawn
+        #   until they are done.
+        while action.repeat():
+            action.perform()
+            self.engine.end_turn()
 
     def ev_quit(self, event: tcod.event.Quit) -> Optional[Action]:
         raise SystemExit()
 
+    def ev_mousebuttondown(self, event: tcod.event.MouseButtonDown) -> Optional[Action]:
+        if event.button != tcod.event.BUTTON_LEFT:
+            return None
+
+        # Travel is imported on first use, so that it isn't loaded before the first frame.
+        from commands.travel import TravelAction
+
+        # Travel to the clicked tile. Only start if there is somewhere to go, so that a pointless click costs no turn.
+        x, y = event.integer_position
+        action = TravelAction(self.engine.player, x, y)
+        return action if action.plan() else None
+
     def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[Action]:
         action: Optional[Action] = None
 
@@ -89,6 +119,12 @@ class EventHandler(tcod.event.EventDispatch[Action]):
             action = BumpAction(player, dx, dy)
         elif key in WAIT_KEYS:
             action = WaitAction(player)
+        elif key in EXPLORE_KEYS:
+            from commands.travel import AutoExploreAction
+
+            explore = AutoExploreAction(player)
+            if explore.plan():
+                action = explore
 
         elif key == tcod.event.K_ESCAPE:
             action = EscapeAction(player)
@@ -0,0 +1,192 @@
+"""
+Light sources and the per-tile light map used to shade the map when it is rendered.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+from tcod.map import compute_fov
+
+from engine.copy_on_write import shallow_copy
+
+if TYPE_CHECKING:
+    from engine.change_journal import Rect
+    from engine.game_map import GameMap
+
+
+class Light(NamedTuple):
+    """
+    How far a light shines and in which color.
+    """
+    radius: int
+    color: Tuple[int, int, int] = (255, 255, 255)
+    intensity: float = 1.0
+
+
+# How many light levels there are between dark and fully lit. Shading in a few coarse steps keeps most tiles the same
+#   color as the light sources move, so there is less to redraw each frame.
+LIGHT_STEPS = 4
+
+# A light's contribution: the rectangle of the map it covers and the light it adds to each tile in it, as RGB levels.
+Contribution = Tuple["Rect", np.ndarray]
+
+
+@lru_cache(maxsize=None)
+def falloff(radius: int) -> np.ndarray:
+    """
+    Return how bright a light of the given radius is around its center, from 1 at the center fading out to 0 just
+    past the radius, as a (2 * radius + 1) square array.
+    """
+    offsets = np.arange(-radius, radius + 1, dtype=np.float32)
+    distance = np.hypot(offsets[:, np.newaxis], offsets[np.newaxis, :])
+    kernel = np.clip(1 - (distance / (radius + 1)) ** 2, 0, 1)
+    kernel.flags.writeable = False
+    return kernel
+
+
+def light_contribution(transparent: np.ndarray, x: int, y: int, light: Light) -> Contribution:
+    """
+    Compute the light a source at (x, y) adds to the tiles it can see.
+
+    Only the window within the light's radius is looked at, so the cost depends on the radius and not the map.
+    """
+    width, height = transparent.shape
+    radius = light.radius
+    x1, y1 = max(0, x - radius), max(0, y - radius)
+    x2, y2 = min(width, x + radius + 1), min(height, y + radius + 1)
+
+    lit = compute_fov(transparent[x1:x2, y1:y2], (x - x1, y - y1), radius=radius)
+    kernel = falloff(radius)[x1 - x + radius: x2 - x + radius, y1 - y + radius: y2 - y + radius]
+    color = np.asarray(light.color, dtype=np.float32) * (light.intensity / 255)
+
+    return (x1, y1, x2, y2), (lit * kernel)[..., np.newaxis] * color
+
+
+def _add(levels: np.ndarray, window: Rect, contribution: Contribution) -> None:
+    """
+    Add a light's contribution to the light levels of a window, clipped to the window.
+    """
+    x1, y1, x2, y2 = window
+    (cx1, cy1, cx2, cy2), light_levels = contribution
+    ox1, oy1 = max(cx1, x1), max(cy1, y1)
+    ox2, oy2 = min(cx2, x2), min(cy2, y2)
+    if ox1 < ox2 and oy1 < oy2:
+        levels[ox1 - x1: ox2 - x1, oy1 - y1: oy2 - y1] += light_levels[ox1 - cx1: ox2 - cx1, oy1 - cy1: oy2 - cy1]
+
+
+class LightMap:
+    """
+    The light sources on a GameMap, added up into light levels for rendering.
+
+    Static lights, like torches, keep their contribution cached until a tile within their radius changes, and the sum
+    of them over the last rendered window is cached too, so a frame where no static light changed costs a single copy
+    however many there are. Lights carried by entities, set as their 'light' attribute, move around and are recomputed
+    every time; the map keeps track of which entities carry one, so an entity given a light after it was added to the
+    map has to be reclassified. Each light is added with a single NumPy addition over its own rectangle.
+    """
+
+    def __init__(self, game_map: GameMap):
+        self.game_map = game_map
+        self.ambient = 0.0  # The light level of tiles no light reaches.
+        self.static_lights: Dict[Tuple[int, int], Light] = {}
+        self._cache: Dict[Tuple[int, int], Contribution] = {}
+        self._static_levels: Optional[Contribution] = None  # The static lights added up over the last window.
+
+        game_map.journal.subscribe(self._on_tiles_changed)
+
+    def fork(self, game_map: GameMap) -> LightMap:
+        """
+        Return a copy of this light map for a fork of its map. The cached contributions are never written to, so they
+        are shared.
+        """
+        child = shallow_copy(self)
+        child.game_map = game_map
+        child.static_lights = dict(self.static_lights)
+        child._cache = dict(self._cache)
+        game_map.journal.subscribe(child._on_tiles_changed)
+        return child
+
+    def add_light(self, x: int, y: int, light: Light) -> None:
+        """
+        Place a static light at a position, replacing any light already there.
+        """
+        self.static_lights[x, y] = light
+        self._cache.pop((x, y), None)
+        self._static_levels = None
+
+    def remove_light(self, x: int, y: int) -> None:
+        """
+        Remove the static light at a position.
+        """
+        del self.static_lights[x, y]
+        self._cache.pop((x, y), None)
+        self._static_levels = None
+
+    def invalidate(self) -> None:
+        """
+        Drop every cached contribution, they'll be recomputed on the next render.
+        """
+        self._cache.clear()
+        self._static_levels = None
+
+    def has_lights(self) -> bool:
+        """
+        Return True if there is any light on the map, static or carried.
+        """
+        return bool(self.static_lights) or any(entity.light for entity in self.game_map.light_carriers)
+
+    def levels(self, x1: int, y1: int, x2: int, y2: int) -> np.ndarray:
+        """
+        Return the light level of every tile in a window, as a (x2 - x1, y2 - y1, 3) array of RGB levels from 0 to 1,
+        rounded to multiples of 1 / LIGHT_STEPS.
+        """
+        window = (x1, y1, x2, y2)
+        if self._static_levels is None or self._static_levels[0] != window:
+            self._static_levels = window, self._add_static(window)
+        levels = self._static_levels[1] + np.float32(self.ambient)
+
+        for entity in self.game_map.light_carriers:
+            light = entity.light
+            if light and x1 - light.radius <= entity.x < x2 + light.radius \
+                    and y1 - light.radius <= entity.y < y2 + light.radius:
+                _add(levels, window, light_contribution(self.game_map.tiles["transparent"], entity.x, entity.y, light))
+
+        np.clip(levels, 0, 1, out=levels)
+        levels *= LIGHT_STEPS
+        np.round(levels, out=levels)
+        levels /= LIGHT_STEPS
+        return levels
+
+    def _add_static(self, window: Rect) -> np.ndarray:
+        """
+        Return the sum of every static light reaching a window, computing the contributions not cached yet.
+        """
+        x1, y1, x2, y2 = window
+        levels = np.zeros((x2 - x1, y2 - y1, 3), dtype=np.float32)
+
+        for position, light in self.static_lights.items():
+            lx, ly = position
+            if x1 - light.radius <= lx < x2 + light.radius and y1 - light.radius <= ly < y2 + light.radius:
+                contribution = self._cache.get(position)
+                if contribution is None:
+                    contribution = self._cache[position] = light_contribution(
+                        self.game_map.tiles["transparent"], lx, ly, light
+                    )
+                _add(levels, window, contribution)
+
+        return levels
+
+    def _on_tiles_changed(self, rects: List[Rect]) -> None:
+        """
+        Drop the cached contributions of static lights whose radius overlaps a changed region.
+        """
+        for position in list(self._cache):
+            lx, ly = position
+            radius = self.static_lights[position].radius
+            for x1, y1, x2, y2 in rects:
+                if x1 <= lx + radius and x2 > lx - radius and y1 <= ly + radius and y2 > ly - radius:
+                    del self._cache[position]
+                    self._static_levels = None
+                    break
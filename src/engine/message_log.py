@@ -0,0 +1,140 @@
+"""
+This module contains the MessageLog, which collects the game's messages for the log panel.
+"""
+from __future__ import annotations
+
+import queue
+import textwrap
+import threading
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from tcod.console import Console
+
+WHITE = (0xFF, 0xFF, 0xFF)
+
+
+class Message:
+    """
+    A single message, shown once however many times in a row it was added.
+    """
+
+    def __init__(self, text: str, fg: Tuple[int, int, int]):
+        self.plain_text = text
+        self.fg = fg
+        self.count = 1
+
+    @property
+    def full_text(self) -> str:
+        """
+        Return the text of this message, with a counter if it was repeated.
+        """
+        if self.count > 1:
+            return f"{self.plain_text} (x{self.count})"
+        return self.plain_text
+
+
+class FileSink:
+    """
+    Writes messages to a file from a background thread, in batches.
+
+    Adding a message only puts it on a queue, so the game never waits on the disk. The writer thread takes everything
+    that has queued up at once and writes it with a single call.
+    """
+
+    _CLOSE = None  # Put on the queue to stop the writer thread.
+
+    def __init__(self, path: str):
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._write_batches, name=f"FileSink({path})", daemon=True)
+        self._thread.start()
+
+    def write(self, text: str) -> None:
+        """
+        Queue a line of text to be written.
+        """
+        self._queue.put(text)
+
+    def close(self) -> None:
+        """
+        Write everything still queued and close the file.
+        """
+        self._queue.put(self._CLOSE)
+        self._thread.join()
+        self._file.close()
+
+    def _write_batches(self) -> None:
+        while True:
+            batch: List[str] = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            closing = self._CLOSE in batch
+            lines = [text for text in batch if text is not self._CLOSE]
+            if lines:
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+            if closing:
+                return
+
+
+class MessageLog:
+    """
+    A fixed-capacity ring buffer of messages.
+
+    Once full, adding a message drops the oldest one. A message which repeats the last one only bumps its counter, and
+    nothing is formatted or wrapped until the log is rendered.
+    """
+
+    def __init__(self, capacity: int = 100, sink: Optional[FileSink] = None):
+        """
+        Initializes a new MessageLog.
+        :param capacity: The number of messages kept.
+        :param sink: Where to also write every message, for headless runs.
+        """
+        self.messages: Deque[Message] = deque(maxlen=capacity)
+        self.sink = sink
+
+    def add_message(self, text: str, fg: Tuple[int, int, int] = WHITE, *, stack: bool = True) -> None:
+        """
+        Add a message to this log.
+        :param text: The message text.
+        :param fg: The text color.
+        :param stack: If True, a message repeating the last one is stacked onto it.
+        """
+        if stack and self.messages and text == self.messages[-1].plain_text:
+            self.messages[-1].count += 1
+        else:
+            self.messages.append(Message(text, fg))
+
+        if self.sink is not None:
+            self.sink.write(text)
+
+    def render(self, console: Console, x: int, y: int, width: int, height: int) -> None:
+        """
+        Render the newest messages that fit in the given area, the newest at the bottom.
+
+        Only the messages which end up on screen are wrapped.
+        """
+        if width <= 0 or height <= 0:
+            return
+
+        y_offset = height - 1
+        for message in reversed(self.messages):
+            for line in reversed(textwrap.wrap(message.full_text, width)):
+                console.print(x=x, y=y + y_offset, string=line, fg=message.fg)
+                y_offset -= 1
+                if y_offset < 0:
+                    return  # No more space to print messages.
+
+    def close(self) -> None:
+        """
+        Close the sink, if there is one.
+        """
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
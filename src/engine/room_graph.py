@@ -0,0 +1,166 @@
+"""
+An abstract graph of a map's rooms and the corridors between them, for hierarchical pathfinding.
+"""
+from __future__ import annotations
+
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+
+from engine.copy_on_write import shallow_copy
+
+if TYPE_CHECKING:
+    from engine.change_journal import Rect
+    from engine.dungeon_gen import RectangularRoom
+    from engine.game_map import GameMap
+
+# An index into the tile array covering one straight leg of a corridor, a single row or column of tiles.
+CorridorLeg = Tuple[slice, slice]
+
+
+class RoomGraph:
+    """
+    The rooms of a GameMap as nodes, joined by the corridors carved between them.
+
+    Long routes are planned room to room on this small graph, so a grid search only has to cover the current room and
+    the next one along the route. Routes are planned backwards from the destination room and cached, so every monster
+    chasing the same target shares one search of the graph.
+
+    The graph is only trusted while the tiles it was built from stay walkable. If any of them is walled up it marks
+    itself invalid and callers fall back to a flat search.
+    """
+
+    def __init__(self, game_map: GameMap):
+        self.game_map = game_map
+        self.rooms: List[RectangularRoom] = []
+        self.neighbours: List[List[Tuple[int, int]]] = []  # (room, cost) pairs for every room.
+        self.room_at = np.full((game_map.width, game_map.height), fill_value=-1, dtype=np.int32, order="F")
+        self.valid = True
+
+        # The tiles the graph depends on: room interiors and corridors.
+        self._support = np.zeros((game_map.width, game_map.height), dtype=bool, order="F")
+        # For each destination room, the next room to move to from every other room.
+        self._next_hops: Dict[int, np.ndarray] = {}
+
+        game_map.journal.subscribe(self._on_tiles_changed)
+
+    def fork(self, game_map: GameMap) -> RoomGraph:
+        """
+        Return a copy of this graph for a fork of its map.
+
+        The rooms and corridors are fixed once the map is generated, so the copy shares them and only keeps its own
+        validity and route cache.
+        """
+        child = shallow_copy(self)
+        child.game_map = game_map
+        child._next_hops = dict(self._next_hops)
+        if child.valid:
+            game_map.journal.subscribe(child._on_tiles_changed)
+        return child
+
+    def add_room(self, room: RectangularRoom) -> int:
+        """
+        Add a room to the graph and return its index.
+        """
+        index = len(self.rooms)
+        self.rooms.append(room)
+        self.neighbours.append([])
+        self.room_at[room.inner] = index
+        self._support[room.inner] = True
+        self._next_hops.clear()
+        return index
+
+    def add_corridor(self, room_a: int, room_b: int, legs: Sequence[CorridorLeg]) -> None:
+        """
+        Connect two rooms with a corridor between their centers, costed by how far it is to walk along it.
+
+        Args:
+            room_a (int): The index of the first room.
+            room_b (int): The index of the second room.
+            legs (Sequence[CorridorLeg]): The straight legs of the corridor from one center to the other, as array
+                indexes, each starting on the tile the previous one ended on.
+        """
+        steps = 0
+        for leg in legs:
+            self._support[leg] = True
+            # A leg is a single row or column, so walking it takes one step less than it has tiles.
+            xs, ys = leg
+            steps += (xs.stop - xs.start) + (ys.stop - ys.start) - 2
+
+        # Each step along a corridor costs 2, like the cardinal steps of a path.
+        cost = 2 * steps
+
+        self.neighbours[room_a].append((room_b, cost))
+        self.neighbours[room_b].append((room_a, cost))
+        self._next_hops.clear()
+
+    def next_leg(self, start: Tuple[int, int], dest: Tuple[int, int]) -> Optional[Tuple[Rect, Tuple[int, int]]]:
+        """
+        Return the next leg of the route from one position to another.
+
+        A leg is the rectangle a grid search has to cover, spanning the current room and the next room along the route,
+        and the waypoint to search for, the next room's center.
+
+        Returns None if the graph can't help: either position is outside a room, both are in the same room, or there is
+        no route between their rooms.
+        """
+        if not self.valid:
+            return None
+
+        start_room = int(self.room_at[start])
+        dest_room = int(self.room_at[dest])
+        if start_room < 0 or dest_room < 0 or start_room == dest_room:
+            return None
+
+        next_hops = self._next_hops.get(dest_room)
+        if next_hops is None:
+            next_hops = self._next_hops[dest_room] = self._plan_to(dest_room)
+
+        next_room = int(next_hops[start_room])
+        if next_room < 0:
+            return None
+
+        return self.window(start_room, next_room), self.rooms[next_room].center
+
+    def window(self, room_a: int, room_b: int) -> Rect:
+        """
+        Return the rectangle covering two rooms, including their walls and the corridor between their centers.
+        """
+        a, b = self.rooms[room_a], self.rooms[room_b]
+        return (
+            min(a.x1, b.x1),
+            min(a.y1, b.y1),
+            min(max(a.x2, b.x2) + 1, self.game_map.width),
+            min(max(a.y2, b.y2) + 1, self.game_map.height),
+        )
+
+    def _plan_to(self, dest_room: int) -> np.ndarray:
+        """
+        Run Dijkstra's algorithm backwards from a room, returning the next hop towards it for every room, -1 if none.
+        """
+        distance = [float("inf")] * len(self.rooms)
+        next_hops = np.full(len(self.rooms), fill_value=-1, dtype=np.int32)
+
+        distance[dest_room] = 0
+        queue = [(0, dest_room)]
+        while queue:
+            cost, room = heapq.heappop(queue)
+            if cost > distance[room]:
+                continue
+            for neighbour, step in self.neighbours[room]:
+                if cost + step < distance[neighbour]:
+                    distance[neighbour] = cost + step
+                    next_hops[neighbour] = room
+                    heapq.heappush(queue, (cost + step, neighbour))
+
+        return next_hops
+
+    def _on_tiles_changed(self, rects: List[Rect]) -> None:
+        walkable = self.game_map.tiles["walkable"]
+        for x1, y1, x2, y2 in rects:
+            region = (slice(x1, x2), slice(y1, y2))
+            if (self._support[region] & ~walkable[region]).any():
+                self.valid = False
+                self.game_map.journal.unsubscribe(self._on_tiles_changed)
+                return
@@ -9,9 +9,11 @@ from typing import Optional, Tuple, TypeVar, TYPE_CHECKING, Type
 
 from components.ai import BaseAI
 from components.fighter import Fighter
+from engine.copy_on_write import shallow_copy
 
 if TYPE_CHECKING:
     from engine.game_map import GameMap
+    from engine.lighting import Light
 
 T = TypeVar("T", bound="Entity")
 
@@ -32,6 +34,7 @@ class Entity:
             color: Tuple[int, int, int] = (255, 255, 255),
             name: str = "<Unnamed>",
             blocks_movement: bool = False,
+            light: Optional[Light] = None,
     ):
         self.x = x
         self.y = y
@@ -39,10 +42,11 @@ class Entity:
         self.color = color
         self.name = name
         self.blocks_movement = blocks_movement
+        self.light = light  # A light carried by this entity, if any.
         if game_map:
             # If game_map is not provided now then it will be set later.
             self.game_map = game_map
-            game_map.entities.add(self)
+            game_map.add_entity(self)
 
     def spawn(self: T, game_map: GameMap, x: int, y: int) -> T:
         """Spawn a copy of this instance at the given location"""
@@ -50,7 +54,13 @@ class Entity:
         clone.x = x
         clone.y = y
         clone.game_map = game_map
-        game_map.entities.add(clone)
+        game_map.add_entity(clone)
+        return clone
+
+    def fork(self: T, game_map: GameMap) -> T:
+        """Return a shallow copy of this entity on a forked map."""
+        clone = shallow_copy(self)
+        clone.game_map = game_map
         return clone
 
     def place(self, x: int, y: int, game_map: Optional[GameMap] = None) -> None:
@@ -62,9 +72,11 @@ class Entity:
 
         if game_map:
             if hasattr(self, "game_map"):
-                self.game_map.entities.remove(self)
+                self.game_map.remove_entity(self)
             self.game_map = game_map
-            game_map.entities.add(self)
+            game_map.add_entity(self)
+        elif hasattr(self, "game_map"):
+            self.game_map.entity_moved(self)
 
     def move(self, dx: int, dy: int) -> None:
         """
@@ -72,6 +84,7 @@ class Entity:
         """
         self.x += dx
         self.y += dy
+        self.game_map.entity_moved(self)
 
 
 class Actor(Entity):
@@ -83,7 +96,8 @@ class Actor(Entity):
                  color: Tuple[int, int, int] = (255, 255, 255),
                  name: str = "<Unnamed>",
                  ai_cls: Type[BaseAI],
-                 fighter: Fighter
+                 fighter: Fighter,
+                 light: Optional[Light] = None,
                  ):
         super().__init__(
             x=x,
@@ -92,6 +106,7 @@ class Actor(Entity):
             color=color,
             name=name,
             blocks_movement=True,
+            light=light,
         )
 
         self.ai: Optional[BaseAI] = ai_cls(self)
@@ -99,6 +114,12 @@ class Actor(Entity):
         self.fighter = fighter
         self.fighter.entity = self
 
+    def fork(self, game_map: GameMap) -> Actor:
+        clone = super().fork(game_map)
+        clone.fighter = self.fighter.fork(clone)
+        clone.ai = self.ai.fork(clone) if self.ai else None
+        return clone
+
     @property
     def is_alive(self) -> bool:
         """Return True as long as this actor can perform actions."""
@@ -1,7 +1,12 @@
 from components.ai import HostileEnemy
 from components.fighter import Fighter
+from engine.lighting import Light
 from entities.entity import Actor
 
+# A light an actor can carry, passed as its 'light'. The player goes without one by default, as shading every step of the
+#   way makes far more of the screen change between turns.
+torch = Light(radius=8, color=(255, 230, 180))
+
 player = Actor(
     char="@",
     color=(255, 255, 255),
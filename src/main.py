@@ -1,15 +1,35 @@
 """Author: Maxim Dribny 2023"""
+import argparse
 import copy
 
-import tcod
-
-from engine.dungeon_gen import generate_dungeon
-from engine.engine import Engine
-from entities import entity_factories
+from utils.startup import StartupProfiler
 
 RESOURCE_PATH = "..\\assets\\"
 
 
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the parser for the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Python Roguelike")
+    parser.add_argument(
+        "--profile-startup",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="LOG",
+        help="Report import and initialisation times up to the first frame and exit. If LOG is given, the timings "
+             "are also appended to it as a JSON line so they can be tracked between runs.",
+    )
+    # The names are checked against 'GENERATORS' once it's imported in 'main', so that the imports are profiled.
+    parser.add_argument(
+        "--generator",
+        default="rooms",
+        help="The dungeon generator to build the map with, one of the names in 'engine.generators.GENERATORS'.",
+    )
+    return parser
+
+
 def main():
     """
     Sets up a game window using the tcod library, loads a tileset, and displays
@@ -18,6 +38,22 @@ def main():
 
     :return: None
     """
+    parser = build_parser()
+    args = parser.parse_args()
+    profiler = StartupProfiler(enabled=args.profile_startup is not None)
+
+    # region: Imports
+    # Subsystems are imported here rather than at the top of the module, so that '--profile-startup' can time each
+    #   module. Ones which aren't needed before the first frame, like travel and pathfinding, are imported on first use.
+    import tcod
+
+    from engine.engine import Engine
+    from engine.generators import GENERATORS
+    from entities import entity_factories
+    # endregion
+
+    if args.generator not in GENERATORS:
+        parser.error(f"argument --generator: invalid choice: '{args.generator}' (choose from {sorted(GENERATORS)})")
 
     # region: Game Constants
     # These constants are used to define the size of the game window and the size of the map.
@@ -26,18 +62,13 @@ def main():
 
     map_width = 80
     map_height = 45
-
-    room_max_size = 10
-    room_min_size = 6
-    max_rooms = 30
-
-    max_monsters_per_room = 2
     # endregion
 
     # region: Tile set and Graphics Options
-    tileset = tcod.tileset.load_tilesheet(
-        f"{RESOURCE_PATH}dejavu10x10_gs_tc.png", 32, 8, tcod.tileset.CHARMAP_TCOD
-    )
+    with profiler.measure("load tileset"):
+        tileset = tcod.tileset.load_tilesheet(
+            f"{RESOURCE_PATH}dejavu10x10_gs_tc.png", 32, 8, tcod.tileset.CHARMAP_TCOD
+        )
     # endregion:
 
     player = copy.deepcopy(entity_factories.player)
@@ -45,30 +76,37 @@ def main():
     engine = Engine(player=player)
 
     # Generate a dungeon map
-    engine.game_map = generate_dungeon(
-        max_rooms=max_rooms,
-        room_min_size=room_min_size,
-        room_max_size=room_max_size,
-        map_width=map_width,
-        map_height=map_height,
-        max_monsters_per_room=max_monsters_per_room,
-        engine=engine
-    )
+    with profiler.measure("generate dungeon"):
+        generator = GENERATORS[args.generator](map_width=map_width, map_height=map_height)
+        engine.game_map = generator.generate(engine)
 
-    engine.update_fov()
+    with profiler.measure("update fov"):
+        engine.update_fov()
 
-    with tcod.context.new_terminal(
+    with profiler.measure("create context"):
+        context = tcod.context.new_terminal(
             screen_width,
             screen_height,
             tileset=tileset,
             title="Python Roguelike",
             vsync=True,
-    ) as context:
+        )
+
+    with context:
         root_console = tcod.Console(screen_width, screen_height, order="F")
-        while True:
+
+        with profiler.measure("render first frame"):
             engine.render(console=root_console, context=context)
+        profiler.mark_first_frame()
+
+        if profiler.enabled:
+            profiler.report(log_path=args.profile_startup or None)
+            return
 
-            engine.event_handler.handle_events()
+        while True:
+            engine.event_handler.handle_events(context)
+
+            engine.render(console=root_console, context=context)
 
 
 if __name__ == "__main__":
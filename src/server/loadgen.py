@@ -0,0 +1,121 @@
+"""
+A scripted-client load generator for the game server.
+
+Usage (from the 'src' directory):
+    python -m server.loadgen [--clients 100] [--turns 200] [--transport inprocess|tcp]
+
+With the in-process transport, or TCP without '--port', a server is started in this process. Each client plays its
+own game with random moves, and the server's and the clients' view of turn latency is reported at the end.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from engine.generators import GENERATORS
+from server.server import GameServer
+from server.session import DIRECTIONS
+
+Send = Callable[[str], Awaitable[str]]
+
+
+async def scripted_player(send: Send, rng: random.Random, turns: int) -> List[float]:
+    """
+    Play 'turns' turns of random moves, returning the latency of each as seen by the client.
+    """
+    directions = list(DIRECTIONS)
+    latencies = []
+    for _ in range(turns):
+        command = "wait" if rng.random() < 0.1 else f"move {rng.choice(directions)}"
+        started = time.perf_counter()
+        await send(command)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def run_inprocess(server: GameServer, index: int, turns: int, seed: int) -> List[float]:
+    client = server.connect(seed=seed + index)
+    try:
+        return await scripted_player(client.send, random.Random(seed + index), turns)
+    finally:
+        await client.close()
+
+
+async def run_tcp(host: str, port: int, index: int, turns: int, seed: int) -> List[float]:
+    reader, writer = await asyncio.open_connection(host, port)
+    await reader.readline()  # The initial state.
+
+    async def send(command: str) -> str:
+        writer.write((command + "\n").encode())
+        await writer.drain()
+        return (await reader.readline()).decode()
+
+    try:
+        return await scripted_player(send, random.Random(seed + index), turns)
+    finally:
+        await send("quit")
+        writer.close()
+
+
+async def generate_load(args: argparse.Namespace) -> dict:
+    server: Optional[GameServer] = None
+    listener = None
+    port = args.port
+
+    if args.transport == "inprocess" or port is None:
+        server = GameServer(generator=args.generator, map_width=args.map_width, map_height=args.map_height)
+    if args.transport == "tcp" and port is None:
+        listener = await server.serve_tcp(args.host, 0)
+        port = listener.sockets[0].getsockname()[1]
+
+    started = time.perf_counter()
+    if args.transport == "inprocess":
+        clients = [run_inprocess(server, index, args.turns, args.seed) for index in range(args.clients)]
+    else:
+        clients = [run_tcp(args.host, port, index, args.turns, args.seed) for index in range(args.clients)]
+    results = await asyncio.gather(*clients)
+    elapsed = time.perf_counter() - started
+
+    if listener is not None:
+        listener.close()
+        await listener.wait_closed()
+
+    latencies = sorted(latency for result in results for latency in result)
+    report = {
+        "clients": args.clients,
+        "transport": args.transport,
+        "turns": len(latencies),
+    }
+    if latencies:
+        report.update({
+            "elapsed_s": round(elapsed, 3),
+            "turns_per_second": round(len(latencies) / elapsed, 1),
+            "client_p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+            "client_p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 3),
+        })
+    if server is not None:
+        report["server"] = server.report()
+
+    return report
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Drive the game server with scripted clients.")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--transport", choices=["inprocess", "tcp"], default="inprocess")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="Connect to a running server instead of starting one.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--generator", choices=sorted(GENERATORS), default="rooms")
+    parser.add_argument("--map-width", type=int, default=80)
+    parser.add_argument("--map-height", type=int, default=45)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    print(json.dumps(asyncio.run(generate_load(parse_args())), indent=2))
@@ -0,0 +1,198 @@
+"""
+An asyncio server hosting many concurrent games in one process.
+
+Usage (from the 'src' directory):
+    python -m server.server [--host 127.0.0.1] [--port 7777] [--unix PATH]
+
+Every connection gets its own GameSession and talks to it with the line protocol described there.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, Optional
+
+from engine.generators import GENERATORS
+from server.session import GameSession, TurnTimer
+
+
+class GameServer:
+    """
+    Owns the sessions and runs their commands, timing each turn.
+
+    Sessions are reached over local sockets with 'serve_tcp' or 'serve_unix', or in-process with 'connect'.
+    """
+
+    def __init__(
+            self,
+            generator: str = "rooms",
+            map_width: int = 80,
+            map_height: int = 45,
+            turns_per_session_per_second: float = 2.0,
+            log_dir: Optional[str] = None,
+    ):
+        self.generator = generator
+        self.map_width = map_width
+        self.map_height = map_height
+        self.turns_per_session_per_second = turns_per_session_per_second
+        self.log_dir = log_dir  # If set, every session writes its messages to a file here.
+
+        self.sessions: Dict[int, GameSession] = {}
+        self.sessions_opened = 0
+        self.timer = TurnTimer()
+
+    def open_session(self, seed: Optional[int] = None) -> GameSession:
+        """
+        Start a new game and return its session.
+        """
+        self.sessions_opened += 1
+        session = GameSession(
+            self.sessions_opened,
+            seed=seed,
+            generator=self.generator,
+            map_width=self.map_width,
+            map_height=self.map_height,
+            log_path=os.path.join(self.log_dir, f"session-{self.sessions_opened}.log") if self.log_dir else None,
+        )
+        self.sessions[session.session_id] = session
+        return session
+
+    def close_session(self, session: GameSession) -> None:
+        """
+        Forget a session, closing it if it's still open.
+        """
+        session.close()
+        self.sessions.pop(session.session_id, None)
+
+    def handle(self, session: GameSession, command: str) -> str:
+        """
+        Run one command for a session and return the reply.
+        """
+        started = time.perf_counter()
+        reply = session.handle(command)
+        self.timer.record(time.perf_counter() - started)
+
+        if session.closed:
+            self.close_session(session)
+
+        return reply
+
+    def report(self) -> dict:
+        """
+        Return the load report: open sessions, and turn latency and estimated sessions per core since the last report.
+        """
+        return {
+            "open_sessions": len(self.sessions),
+            "sessions_opened": self.sessions_opened,
+            **self.timer.report(self.turns_per_session_per_second),
+        }
+
+    def connect(self, seed: Optional[int] = None) -> InProcessClient:
+        """
+        Open a session for a client living in the same process.
+        """
+        return InProcessClient(self, self.open_session(seed))
+
+    async def serve_tcp(self, host: str = "127.0.0.1", port: int = 7777) -> asyncio.AbstractServer:
+        """
+        Start accepting connections on a TCP socket.
+        """
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+    async def serve_unix(self, path: str) -> asyncio.AbstractServer:
+        """
+        Start accepting connections on a Unix domain socket.
+        """
+        return await asyncio.start_unix_server(self._serve_connection, path)
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = self.open_session()
+        try:
+            writer.write((json.dumps(session.state()) + "\n").encode())
+            await writer.drain()
+
+            while not session.closed:
+                line = await reader.readline()
+                if not line:
+                    break  # The client hung up.
+
+                writer.write((self.handle(session, line.decode()) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.close_session(session)
+            writer.close()
+
+
+class InProcessClient:
+    """
+    A client talking to a session directly, without a socket.
+    """
+
+    def __init__(self, server: GameServer, session: GameSession):
+        self.server = server
+        self.session = session
+
+    async def send(self, command: str) -> str:
+        """
+        Send a command and return the reply.
+        """
+        # Give the other sessions a turn, as waiting on a socket would.
+        await asyncio.sleep(0)
+        return self.server.handle(self.session, command)
+
+    async def close(self) -> None:
+        """
+        Close the session.
+        """
+        if not self.session.closed:
+            await self.send("quit")
+
+
+async def report_periodically(server: GameServer, interval: float) -> None:
+    """
+    Print the server's load report to stderr every 'interval' seconds.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        print(json.dumps(server.report()), file=sys.stderr)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    server = GameServer(
+        generator=args.generator,
+        map_width=args.map_width,
+        map_height=args.map_height,
+        log_dir=args.log_dir,
+    )
+    if args.unix:
+        listener = await server.serve_unix(args.unix)
+    else:
+        listener = await server.serve_tcp(args.host, args.port)
+
+    async with listener:
+        if args.report_interval > 0:
+            asyncio.ensure_future(report_periodically(server, args.report_interval))
+        await listener.serve_forever()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Host many concurrent games over local sockets.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", metavar="PATH", help="Listen on a Unix domain socket instead of TCP.")
+    parser.add_argument("--generator", choices=sorted(GENERATORS), default="rooms")
+    parser.add_argument("--map-width", type=int, default=80)
+    parser.add_argument("--map-height", type=int, default=45)
+    parser.add_argument("--log-dir", help="Write each session's message log to a file in this directory.")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between load reports, 0 for none.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve(parse_args()))
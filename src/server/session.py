@@ -0,0 +1,217 @@
+"""
+A single game, driven by text commands instead of tcod events.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from commands.actions import Action, BumpAction, WaitAction
+from engine.engine import Engine
+from engine.generators import GENERATORS
+from engine.message_log import FileSink
+from entities import entity_factories
+
+# Direction names accepted by the 'move' command, next to plain 'move <dx> <dy>'.
+DIRECTIONS: Dict[str, Tuple[int, int]] = {
+    "n": (0, -1),
+    "s": (0, 1),
+    "w": (-1, 0),
+    "e": (1, 0),
+    "nw": (-1, -1),
+    "ne": (1, -1),
+    "sw": (-1, 1),
+    "se": (1, 1),
+}
+
+
+class SessionClosed(Exception):
+    """
+    Raised when a command is sent to a session which has been closed.
+    """
+
+
+class GameSession:
+    """
+    One isolated game: its own Engine, GameMap and random number generator.
+
+    Nothing is shared with other sessions. The entity prototypes in 'entity_factories' are only ever deep copied, never
+    changed, so every session gets its own player and monsters.
+
+    Commands are lines of text:
+        move <dx> <dy> | move <n|s|e|w|ne|nw|se|sw>
+        wait
+        look
+        quit
+    Each command is answered with a line of JSON describing the player's situation.
+    """
+
+    def __init__(
+            self,
+            session_id: int,
+            seed: Optional[int] = None,
+            generator: str = "rooms",
+            map_width: int = 80,
+            map_height: int = 45,
+            log_path: Optional[str] = None,
+    ):
+        self.session_id = session_id
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.turn = 0
+        self.closed = False
+
+        player = copy.deepcopy(entity_factories.player)
+        self.engine = Engine(player=player, rng=random.Random(self.seed))
+        self.engine.game_map = GENERATORS[generator](map_width=map_width, map_height=map_height).generate(self.engine)
+        self.engine.update_fov()
+
+        if log_path:
+            # Keep a record of the game's messages without slowing its turns down.
+            self.engine.message_log.sink = FileSink(log_path)
+
+    def close(self) -> None:
+        """
+        End this session, flushing its message log.
+        """
+        self.closed = True
+        self.engine.message_log.close()
+
+    def parse(self, command: str) -> Optional[Action]:
+        """
+        Turn a command into the player's action, or None if it doesn't take a turn.
+
+        Raises:
+            ValueError: If the command isn't understood.
+        """
+        player = self.engine.player
+        words = command.split()
+        if not words:
+            raise ValueError("Empty command.")
+
+        verb, arguments = words[0].lower(), words[1:]
+        if verb == "move":
+            if len(arguments) == 1 and arguments[0].lower() in DIRECTIONS:
+                return BumpAction(player, *DIRECTIONS[arguments[0].lower()])
+            if len(arguments) == 2:
+                dx, dy = int(arguments[0]), int(arguments[1])
+                if max(abs(dx), abs(dy)) == 1:
+                    return BumpAction(player, dx, dy)
+            raise ValueError("Usage: move <dx> <dy> or move <direction>, one step at a time.")
+        if verb == "wait":
+            return WaitAction(player)
+        if verb == "look":
+            return None
+
+        raise ValueError(f"Unknown command {verb!r}.")
+
+    def handle(self, command: str) -> str:
+        """
+        Run a command and return the JSON reply.
+
+        Raises:
+            SessionClosed: If the session was already closed.
+        """
+        if self.closed:
+            raise SessionClosed(f"Session {self.session_id} is closed.")
+
+        if command.strip().lower() == "quit":
+            self.close()
+            return json.dumps({"session": self.session_id, "closed": True})
+
+        try:
+            action = self.parse(command)
+        except ValueError as error:
+            return json.dumps({"session": self.session_id, "error": str(error)})
+
+        if action is not None:
+            self.engine.event_handler.handle_action(action)
+            self.turn += 1
+
+        return json.dumps(self.state())
+
+    def state(self) -> dict:
+        """
+        Return a compact description of the player's situation.
+        """
+        engine = self.engine
+        player = engine.player
+        visible = engine.game_map.visible
+        return {
+            "session": self.session_id,
+            "turn": self.turn,
+            "x": player.x,
+            "y": player.y,
+            "hp": player.fighter.hp,
+            "enemies_in_view": sum(
+                1 for actor in engine.game_map.actors if actor is not player and visible[actor.x, actor.y]
+            ),
+        }
+
+
+# How many of the latest command latencies a TurnTimer keeps for its percentiles.
+MAX_SAMPLES = 10_000
+
+
+class TurnTimer:
+    """
+    Collects the time taken to handle each command, for load reports.
+
+    Every report covers the commands handled since the previous one. The count and mean cover all of them, while the
+    percentiles come from the latest MAX_SAMPLES, so a long-running server neither grows its memory nor takes longer to
+    report the longer it runs.
+    """
+
+    def __init__(self) -> None:
+        self.samples: Deque[float] = deque(maxlen=MAX_SAMPLES)
+        self.turns = 0
+        self.total = 0.0
+        self.started = time.perf_counter()
+
+    def record(self, seconds: float) -> None:
+        """
+        Record the time one command took.
+        """
+        self.samples.append(seconds)
+        self.turns += 1
+        self.total += seconds
+
+    def reset(self) -> None:
+        """
+        Forget the recorded latencies, starting a new report interval.
+        """
+        self.samples.clear()
+        self.turns = 0
+        self.total = 0.0
+        self.started = time.perf_counter()
+
+    def report(self, turns_per_session_per_second: float) -> dict:
+        """
+        Summarise the latencies recorded since the last report, and start a new interval.
+
+        The server runs every session on a single asyncio event loop, so it uses one core. 'sessions_per_core' is how
+        many sessions that core could keep up with if each player took 'turns_per_session_per_second' turns a second.
+        """
+        samples = sorted(self.samples)
+        turns, total, elapsed = self.turns, self.total, time.perf_counter() - self.started
+        self.reset()
+        if not samples:
+            return {"turns": 0}
+
+        def percentile(fraction: float) -> float:
+            return samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000
+
+        mean = total / turns
+        return {
+            "turns": turns,
+            "elapsed_s": round(elapsed, 3),
+            "mean_ms": round(mean * 1000, 3),
+            "p50_ms": round(percentile(0.50), 3),
+            "p95_ms": round(percentile(0.95), 3),
+            "p99_ms": round(percentile(0.99), 3),
+            "max_ms": round(samples[-1] * 1000, 3),
+            "sessions_per_core": int(1 / (mean * turns_per_session_per_second)),
+        }
@@ -0,0 +1,224 @@
+"""
+Run batches of seeded, simulated games across a process pool.
+
+Usage (from the 'src' directory):
+    python -m simulation.batch --games 1000 --policy hunter --out results.jsonl
+
+Results are streamed to the output file as JSON lines while the batch runs. Running the same command again resumes an
+interrupted batch: seeds already in the output file are skipped. Every record holds the full configuration of its game,
+and a batch refuses to resume from a file written with a different configuration.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Iterator, List, NamedTuple, Set
+
+from engine.engine import Engine
+from engine.generators import GENERATORS
+from entities import entity_factories
+from simulation.policies import POLICIES
+
+
+class GameConfig(NamedTuple):
+    """
+    Everything needed to replay one simulated game.
+    """
+    seed: int
+    policy: str
+    max_turns: int
+    generator: str
+    map_width: int
+    map_height: int
+
+
+class GameResult(NamedTuple):
+    """
+    The compact outcome of one simulated game.
+    """
+    config: GameConfig
+    turns: int  # Turns survived.
+    alive: bool
+    kills: int
+    seconds_per_turn: float
+
+
+def run_game(config: GameConfig) -> GameResult:
+    """
+    Play one game with a scripted policy until the player dies or 'max_turns' turns have passed.
+    """
+    engine = Engine(player=copy.deepcopy(entity_factories.player), rng=random.Random(config.seed))
+    engine.game_map = GENERATORS[config.generator](
+        map_width=config.map_width, map_height=config.map_height
+    ).generate(engine)
+    engine.update_fov()
+
+    player = engine.player
+    policy = POLICIES[config.policy](engine)
+
+    turns = 0
+    started = time.perf_counter()
+    while turns < config.max_turns and player.is_alive:
+        engine.event_handler.handle_action(policy.choose())
+        turns += 1
+    elapsed = time.perf_counter() - started
+
+    kills = sum(1 for corpse in engine.game_map.corpses if corpse is not player)
+    return GameResult(config, turns, player.is_alive, kills, elapsed / max(turns, 1))
+
+
+def run_chunk(configs: List[GameConfig]) -> List[GameResult]:
+    """
+    Play several games in a worker process. Games are handed out in chunks to keep the pool's overhead low.
+    """
+    return [run_game(config) for config in configs]
+
+
+class Aggregate:
+    """
+    Running totals over the results of a batch.
+    """
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.turns = 0
+        self.survived = 0
+        self.kills = 0
+        self.simulation_seconds = 0.0
+
+    def add(self, result: GameResult) -> None:
+        """
+        Add one game's result to the totals.
+        """
+        self.games += 1
+        self.turns += result.turns
+        self.survived += result.alive
+        self.kills += result.kills
+        self.simulation_seconds += result.seconds_per_turn * result.turns
+
+    def summary(self) -> dict:
+        """
+        Return the averages over every game added so far.
+        """
+        games = max(self.games, 1)
+        return {
+            "games": self.games,
+            "mean_turns": round(self.turns / games, 2),
+            "survival_rate": round(self.survived / games, 4),
+            "mean_kills": round(self.kills / games, 3),
+            "us_per_turn": round(self.simulation_seconds / max(self.turns, 1) * 1e6, 2),
+        }
+
+
+def read_results(path: str) -> Iterator[GameResult]:
+    """
+    Read the results already written to an output file. A line cut short by an interruption is skipped.
+    """
+    if not os.path.exists(path):
+        return
+
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+                yield GameResult(
+                    GameConfig(*(record[field] for field in GameConfig._fields)),
+                    record["turns"],
+                    record["alive"],
+                    record["kills"],
+                    record["us_per_turn"] / 1e6,
+                )
+            except (ValueError, KeyError):
+                continue
+
+
+def end_with_newline(path: str) -> None:
+    """
+    Terminate a line cut short by an interruption, so that the next record appended starts on a line of its own.
+    """
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return
+
+    with open(path, "rb+") as file:
+        file.seek(-1, os.SEEK_END)
+        if file.read(1) != b"\n":
+            file.write(b"\n")
+
+
+def run_batch(args: argparse.Namespace) -> dict:
+    """
+    Run every game of the batch which isn't in the output file yet, and return the summary over all of them.
+    """
+    aggregate = Aggregate()
+    seeds = range(args.seed_start, args.seed_start + args.games)
+    batch = GameConfig(args.seed_start, args.policy, args.max_turns, args.generator, args.map_width, args.map_height)
+    done: Set[int] = set()
+    if args.fresh and os.path.exists(args.out):
+        os.remove(args.out)
+    for result in read_results(args.out):
+        seed = result.config.seed
+        if result.config._replace(seed=batch.seed) != batch:
+            raise SystemExit(
+                f"{args.out} holds results for {result.config}, which doesn't match this batch. "
+                f"Pass --fresh to discard them, or write to another file with --out."
+            )
+        if seed in seeds and seed not in done:
+            done.add(seed)
+            aggregate.add(result)
+
+    configs = [batch._replace(seed=seed) for seed in seeds if seed not in done]
+    chunks = [configs[i: i + args.chunk_size] for i in range(0, len(configs), args.chunk_size)]
+    if done:
+        print(f"Resuming: {len(done)} games already done, {len(configs)} to go.", file=sys.stderr)
+
+    end_with_newline(args.out)
+    started = time.perf_counter()
+    with open(args.out, "a", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=args.workers) as pool:
+        pending: Set[Future] = {pool.submit(run_chunk, chunk) for chunk in chunks}
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                for result in future.result():
+                    aggregate.add(result)
+                    out.write(json.dumps({
+                        **result.config._asdict(),
+                        "turns": result.turns,
+                        "alive": result.alive,
+                        "kills": result.kills,
+                        "us_per_turn": round(result.seconds_per_turn * 1e6, 2),
+                    }) + "\n")
+            # Flush after every chunk, so an interrupted batch loses at most the chunks still running.
+            out.flush()
+    elapsed = time.perf_counter() - started
+
+    summary = aggregate.summary()
+    summary["workers"] = args.workers
+    summary["games_per_second"] = round(len(configs) / elapsed, 2) if configs else None
+    return summary
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run batches of simulated games in parallel.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed-start", type=int, default=0)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="hunter")
+    parser.add_argument("--max-turns", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=8, help="Games handed to a worker at a time.")
+    parser.add_argument("--out", default="results.jsonl")
+    parser.add_argument("--fresh", action="store_true", help="Discard the results of a previous run instead of resuming.")
+    parser.add_argument("--generator", choices=sorted(GENERATORS), default="rooms")
+    parser.add_argument("--map-width", type=int, default=80)
+    parser.add_argument("--map-height", type=int, default=45)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    print(json.dumps(run_batch(parse_args()), indent=2))
@@ -0,0 +1,82 @@
+"""
+Scripted player policies for simulated games.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional, Type, TYPE_CHECKING
+
+from commands.actions import Action, BumpAction, WaitAction
+
+if TYPE_CHECKING:
+    from engine.engine import Engine
+
+# The eight directions a player can step in.
+DIRECTIONS = [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+
+
+class Policy:
+    """
+    Base class for scripted players. A policy picks the player's action each turn.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def choose(self) -> Optional[Action]:
+        """
+        Return the player's action for this turn.
+
+        This method must be overriden by Policy subclasses.
+        """
+        raise NotImplementedError()
+
+
+class WaitPolicy(Policy):
+    """
+    Never moves, letting the monsters come.
+    """
+
+    def choose(self) -> Optional[Action]:
+        return WaitAction(self.engine.player)
+
+
+class RandomWalkPolicy(Policy):
+    """
+    Steps in a random direction every turn, attacking whatever is in the way.
+    """
+
+    def choose(self) -> Optional[Action]:
+        return BumpAction(self.engine.player, *self.engine.rng.choice(DIRECTIONS))
+
+
+class HunterPolicy(RandomWalkPolicy):
+    """
+    Heads straight for the nearest visible monster, and wanders randomly when none is in view.
+    """
+
+    def choose(self) -> Optional[Action]:
+        player = self.engine.player
+        game_map = self.engine.game_map
+
+        nearest = None
+        nearest_distance = 0
+        for actor in game_map.actors:
+            if actor is player or not game_map.visible[actor.x, actor.y]:
+                continue
+            distance = max(abs(actor.x - player.x), abs(actor.y - player.y))
+            if nearest is None or distance < nearest_distance:
+                nearest, nearest_distance = actor, distance
+
+        if nearest is None:
+            return super().choose()
+
+        dx = (nearest.x > player.x) - (nearest.x < player.x)
+        dy = (nearest.y > player.y) - (nearest.y < player.y)
+        return BumpAction(player, dx, dy)
+
+
+POLICIES: Dict[str, Type[Policy]] = {
+    "wait": WaitPolicy,
+    "random": RandomWalkPolicy,
+    "hunter": HunterPolicy,
+}
@@ -0,0 +1,78 @@
+"""
+Watch a simulated game in a terminal, or record it, without a display.
+
+Usage (from the 'src' directory):
+    python -m simulation.watch --policy hunter --seed 3
+    python -m simulation.watch --seed 3 --record game.ans --delay 0
+
+A recording is the raw terminal output, replay it with 'cat game.ans'.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+import sys
+import time
+
+import tcod
+
+from engine.ansi_renderer import AnsiRenderer
+from engine.engine import Engine
+from engine.generators import GENERATORS
+from entities import entity_factories
+from simulation.policies import POLICIES
+
+
+def watch(args: argparse.Namespace) -> None:
+    """
+    Play one game with a scripted policy, drawing every turn with an AnsiRenderer.
+    """
+    engine = Engine(player=copy.deepcopy(entity_factories.player), rng=random.Random(args.seed))
+    engine.game_map = GENERATORS[args.generator](map_width=args.map_width, map_height=args.map_height).generate(engine)
+    engine.update_fov()
+
+    policy = POLICIES[args.policy](engine)
+    console = tcod.console.Console(args.map_width, args.map_height + args.log_height, order="F")
+
+    stream = open(args.record, "w", encoding="utf-8") if args.record else sys.stdout
+    renderer = AnsiRenderer(stream)
+    started = time.perf_counter()
+    try:
+        engine.render(console=console, context=renderer)
+        for _ in range(args.turns):
+            if not engine.player.is_alive:
+                break
+            engine.event_handler.handle_action(policy.choose())
+            engine.render(console=console, context=renderer)
+            if args.delay:
+                time.sleep(args.delay)
+    finally:
+        renderer.close()
+        if args.record:
+            stream.close()
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{renderer.frames} frames, {renderer.bytes_written / renderer.frames:.0f} bytes per frame, "
+        f"{elapsed / renderer.frames * 1e3:.2f} ms per turn and frame",
+        file=sys.stderr,
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Watch a simulated game in a terminal.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="hunter")
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--delay", type=float, default=0.05, help="Seconds to wait between turns.")
+    parser.add_argument("--record", metavar="FILE", help="Write the frames to a file instead of the terminal.")
+    parser.add_argument("--generator", choices=sorted(GENERATORS), default="rooms")
+    parser.add_argument("--map-width", type=int, default=80)
+    parser.add_argument("--map-height", type=int, default=45)
+    parser.add_argument("--log-height", type=int, default=5, help="Rows for the message log below the map.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    watch(parse_args())
@@ -0,0 +1,137 @@
+"""
+Startup profiling, used by 'main.py --profile-startup'.
+"""
+from __future__ import annotations
+
+import contextlib
+import json
+import sys
+import time
+from importlib.abc import MetaPathFinder
+from importlib.machinery import ModuleSpec
+from types import ModuleType
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+# How many of the slowest modules the report lists, the log has all of them.
+REPORT_MODULES = 20
+
+
+class ImportTimer(MetaPathFinder):
+    """
+    Records how long each module takes to import, net of the modules it imports in turn, like 'python -X importtime'.
+
+    It sits first on 'sys.meta_path' and hands the search for each module to the finders after it, wrapping the
+    loader it gets back so that running the module's code is timed. Modules built into the interpreter are left alone.
+    """
+
+    def __init__(self) -> None:
+        self.self_times: Dict[str, float] = {}
+        self._child_times: List[float] = []  # For each module being run, the time spent importing its own imports.
+
+    def install(self) -> None:
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(
+            self, fullname: str, path: Optional[Sequence[str]], target: Optional[ModuleType] = None
+    ) -> Optional[ModuleSpec]:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        # Finders like the one for built-in modules hand out their class as the loader, which mustn't be patched.
+        loader = spec.loader
+        if loader is not None and not isinstance(loader, type) and hasattr(loader, "exec_module"):
+            loader.exec_module = self._timed(fullname, loader.exec_module)  # type: ignore
+        return spec
+
+    def _timed(self, name: str, exec_module: Callable[[ModuleType], None]) -> Callable[[ModuleType], None]:
+        def exec_timed(module: ModuleType) -> None:
+            self._child_times.append(0.0)
+            started = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.self_times[name] = elapsed - self._child_times.pop()
+                if self._child_times:
+                    self._child_times[-1] += elapsed
+
+        return exec_timed
+
+
+class StartupProfiler:
+    """
+    Records how long each module import and initialisation step takes until the first frame is presented.
+
+    Imports are timed per module while the profiler is enabled, each one without the modules it pulls in, so that the
+    report shows where the time actually goes whichever module happens to import a dependency first. When disabled,
+    every method is a cheap no-op so the normal startup path doesn't pay for it.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.timings: List[Tuple[str, float]] = []
+        self.first_frame: Optional[float] = None
+
+        self.imports = ImportTimer()
+        if enabled:
+            self.imports.install()
+
+    @contextlib.contextmanager
+    def measure(self, label: str) -> Iterator[None]:
+        """
+        Time the body of a 'with' block under the given label.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.append((label, time.perf_counter() - started))
+
+    def mark_first_frame(self) -> None:
+        """
+        Record the time to first frame, measured from when this profiler was created, and stop timing imports.
+        """
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter() - self.start
+            self.imports.uninstall()
+
+    def report(self, stream: TextIO = sys.stderr, log_path: Optional[str] = None) -> None:
+        """
+        Print the recorded timings, and append them as a JSON line to 'log_path' so they can be tracked over time.
+        """
+        imports = sorted(self.imports.self_times.items(), key=lambda item: item[1], reverse=True)
+        total = sum(seconds for _, seconds in imports)
+
+        print("Startup profile:", file=stream)
+        print(f"  {len(imports)} modules imported in {total * 1000:.2f} ms, the slowest by their own time:", file=stream)
+        for module, seconds in imports[:REPORT_MODULES]:
+            print(f"    {module:<38} {seconds * 1000:>9.2f} ms", file=stream)
+        for label, seconds in self.timings:
+            print(f"  {label:<40} {seconds * 1000:>9.2f} ms", file=stream)
+        if self.first_frame is not None:
+            print(f"  {'time to first frame':<40} {self.first_frame * 1000:>9.2f} ms", file=stream)
+
+        if log_path:
+            record = {
+                "time": time.time(),
+                "imports_ms": {module: round(seconds * 1000, 3) for module, seconds in imports},
+                "timings_ms": {label: round(seconds * 1000, 3) for label, seconds in self.timings},
+                "first_frame_ms": None if self.first_frame is None else round(self.first_frame * 1000, 3),
+            }
+            with open(log_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record) + "\n")